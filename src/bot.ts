@@ -10,14 +10,17 @@ if (!token) {
   process.exit(1);
 }
 
+// Only the intents a handler actually consumes — each extra intent is more gateway
+// traffic to decode. Presence, typing, voice and DM-reaction intents are deliberately
+// absent; add an intent only alongside the handler that needs it.
 const client = new Client({
   intents: [
-    GatewayIntentBits.Guilds,
-    GatewayIntentBits.GuildMessages,
-    GatewayIntentBits.MessageContent,
-    GatewayIntentBits.GuildMessageReactions,
-    GatewayIntentBits.GuildMembers,
-    GatewayIntentBits.DirectMessages,
+    GatewayIntentBits.Guilds,                // guild/channel cache, GuildCreate allowlist
+    GatewayIntentBits.GuildMessages,         // onMessage security + metadata scan
+    GatewayIntentBits.MessageContent,        // scam/pattern scoring reads message text
+    GatewayIntentBits.GuildMessageReactions, // onReaction numbered/batch emoji
+    GatewayIntentBits.GuildMembers,          // onJoin ban-registry alert, member roles
+    GatewayIntentBits.DirectMessages,        // DM auto-reply in onMessage
   ],
 });
 
@@ -1,5 +1,5 @@
 import { ChatInputCommandInteraction, AttachmentBuilder, SlashCommandBuilder,  MessageFlags} from 'discord.js';
-import { geminiRateLimiter, LLM_PROVIDER_PRIORITY, AVAILABLE_PROVIDERS, NSFW_PROVIDER_OVERRIDE, SCAN_LIMIT_BYTES } from '../lib/config';
+import { geminiRateLimiter, LLM_PROVIDER_PRIORITY, AVAILABLE_PROVIDER_SET, NSFW_PROVIDER_OVERRIDE, SCAN_LIMIT_BYTES } from '../lib/config';
 import { getGuildSetting } from '../lib/guild-settings';
 import { askGemini, askGroq, askClaude, describeWithGemini, describeWithClaude, generateGemini, generateGroq, generateClaude } from '../lib/ai-providers';
 
@@ -218,7 +218,7 @@ export const describeCommand = {
       let description: string | undefined;
       let providerUsed = '';
 
-      const providers = NSFW_PROVIDER_OVERRIDE && AVAILABLE_PROVIDERS.includes(NSFW_PROVIDER_OVERRIDE)
+      const providers = NSFW_PROVIDER_OVERRIDE && AVAILABLE_PROVIDER_SET.has(NSFW_PROVIDER_OVERRIDE)
         ? [NSFW_PROVIDER_OVERRIDE]
         : LLM_PROVIDER_PRIORITY;
 
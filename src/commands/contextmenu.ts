@@ -1,7 +1,7 @@
 import { ApplicationCommandType, ContextMenuCommandBuilder, MessageContextMenuCommandInteraction,  MessageFlags} from 'discord.js';
 import { extractMetadataFromBuffer } from '../lib/metadata';
 import { formatMetadataEmbed } from '../lib/format';
-import { SCAN_LIMIT_BYTES } from '../lib/config';
+import { isScannablePng } from '../lib/config';
 
 export const viewPromptCommand = {
   data: new ContextMenuCommandBuilder()
@@ -11,9 +11,7 @@ export const viewPromptCommand = {
   async execute(interaction: MessageContextMenuCommandInteraction) {
     const message = interaction.targetMessage;
 
-    const pngAttachments = [...message.attachments.values()].filter(
-      a => a.name.toLowerCase().endsWith('.png') && a.size < SCAN_LIMIT_BYTES
-    );
+    const pngAttachments = [...message.attachments.values()].filter(isScannablePng);
 
     if (!pngAttachments.length) {
       return interaction.reply({ content: '❌ No PNG images found in that message.', flags: MessageFlags.Ephemeral });
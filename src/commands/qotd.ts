@@ -1,5 +1,5 @@
 import { ChatInputCommandInteraction, EmbedBuilder, Colors, PermissionFlagsBits, SlashCommandBuilder, TextChannel, ChannelType, MessageFlags } from 'discord.js';
-import { getQotdConfig, setQotdConfig, addQotdQuestion, parseInterval, formatInterval, loadSeedQuestions } from '../lib/scheduler';
+import { getQotdConfig, setQotdConfig, addQotdQuestion, addQotdQuestions, parseInterval, formatInterval, loadSeedQuestions, unusedQotdQuestions } from '../lib/scheduler';
 
 export const qotdCommand = {
   data: new SlashCommandBuilder()
@@ -75,12 +75,15 @@ export const qotdCommand = {
       const cfg = getQotdConfig(interaction.guildId!);
       if (!cfg) return interaction.reply({ content: '❌ QOTD not set up yet. Use `/qotd setup` first.', flags: MessageFlags.Ephemeral });
 
+      // cfg is the cached store object that addQotdQuestion pushes into, so take the
+      // pool size before the add rather than adding to it afterwards.
+      const before = cfg.questions.length;
       const question = interaction.options.getString('question', true);
       const added = addQotdQuestion(interaction.guildId!, question);
 
       await interaction.reply({
         content: added
-          ? `✅ Question added! Pool now has **${cfg.questions.length + 1}** questions.`
+          ? `✅ Question added! Pool now has **${before + 1}** questions.`
           : '❌ That question is already in the pool.',
         flags: MessageFlags.Ephemeral,
       });
@@ -91,7 +94,7 @@ export const qotdCommand = {
       const cfg = getQotdConfig(interaction.guildId!);
       if (!cfg) return interaction.reply({ content: '❌ QOTD is not set up on this server.', flags: MessageFlags.Ephemeral });
 
-      const remaining = cfg.questions.filter(q => !cfg.usedQuestions.includes(q)).length;
+      const remaining = unusedQotdQuestions(cfg).length;
       const nextPost = cfg.lastPosted + cfg.intervalMs;
       const nextIn = Math.max(0, nextPost - Date.now());
       const nextStr = nextIn === 0 ? 'soon (next tick)' : `in ~${formatInterval(nextIn)}`;
@@ -118,10 +121,10 @@ export const qotdCommand = {
       const cfg = getQotdConfig(interaction.guildId!);
       if (!cfg || !cfg.questions.length) return interaction.reply({ content: '❌ No questions in pool.', flags: MessageFlags.Ephemeral });
 
-      const unused = cfg.questions.filter(q => !cfg.usedQuestions.includes(q));
+      const unused = unusedQotdQuestions(cfg);
       const pool = unused.length ? unused : cfg.questions;
-      if (!unused.length) setQotdConfig(interaction.guildId!, { usedQuestions: [] });
 
+      // One save: when the cycle is exhausted the used list restarts with this question.
       const question = pool[Math.floor(Math.random() * pool.length)];
       setQotdConfig(interaction.guildId!, {
         usedQuestions: [...(unused.length ? cfg.usedQuestions : []), question],
@@ -146,13 +149,11 @@ export const qotdCommand = {
         return interaction.reply({ content: '❌ No questions found in `qotd-questions.json`.', flags: MessageFlags.Ephemeral });
       }
 
-      let added = 0;
-      for (const q of questions) {
-        if (addQotdQuestion(interaction.guildId!, q)) added++;
-      }
+      const before = cfg.questions.length;
+      const added = addQotdQuestions(interaction.guildId!, questions);
 
       await interaction.reply({
-        content: `✅ Imported **${added}** new questions (${questions.length - added} already existed). Pool now has **${cfg.questions.length + added}** questions.`,
+        content: `✅ Imported **${added}** new questions (${questions.length - added} already existed). Pool now has **${before + added}** questions.`,
         flags: MessageFlags.Ephemeral,
       });
     }
@@ -1,10 +1,11 @@
 import {
   ChatInputCommandInteraction, PermissionFlagsBits, SlashCommandBuilder, MessageFlags,
 } from 'discord.js';
-import { getModeration, setModerationField } from '../lib/guild-settings';
+import { getModeration, setModerationField, setModerationFields } from '../lib/guild-settings';
 import { ENV_MOD_DEFAULTS } from '../lib/config';
 import { CROSS_POST_WINDOW } from '../lib/security';
 import { TRUSTED_USERS_MAX, TRUSTED_ROLES_MAX } from '../lib/settings-panel';
+import type { GuildModeration } from '../lib/settings-types';
 
 export const securityCommand = {
   data: new SlashCommandBuilder()
@@ -48,9 +49,11 @@ export const securityCommand = {
       const ch = interaction.options.getInteger('channels');
       const same = interaction.options.getInteger('same');
       const win = interaction.options.getInteger('window');
-      if (ch != null) setModerationField(guildId, 'mediaSpamChannels', ch);
-      if (same != null) setModerationField(guildId, 'mediaSpamSameChannels', same);
-      if (win != null) setModerationField(guildId, 'mediaSpamWindowSec', win);
+      const fields: Partial<GuildModeration> = {};
+      if (ch != null) fields.mediaSpamChannels = ch;
+      if (same != null) fields.mediaSpamSameChannels = same;
+      if (win != null) fields.mediaSpamWindowSec = win;
+      if (Object.keys(fields).length) setModerationFields(guildId, fields);
     } else if (sub === 'largemedia') {
       const types = interaction.options.getString('types');
       if (types != null) {
@@ -78,16 +81,18 @@ export const securityCommand = {
           return interaction.reply({ content: `❌ Trusted roles limit is ${TRUSTED_ROLES_MAX}.`, flags: MessageFlags.Ephemeral });
         }
       }
+      const fields: Partial<GuildModeration> = {};
       if (user) {
         const set = new Set(cur.trustedUserIds);
         if (sub === 'trust') set.add(user.id); else set.delete(user.id);
-        setModerationField(guildId, 'trustedUserIds', [...set]);
+        fields.trustedUserIds = [...set];
       }
       if (role) {
         const set = new Set(cur.trustedRoleIds);
         if (sub === 'trust') set.add(role.id); else set.delete(role.id);
-        setModerationField(guildId, 'trustedRoleIds', [...set]);
+        fields.trustedRoleIds = [...set];
       }
+      setModerationFields(guildId, fields);
     }
 
     const r = getModeration(guildId, ENV_MOD_DEFAULTS);
@@ -3,7 +3,7 @@ import {
   type AnySelectMenuInteraction, type ButtonInteraction,
 } from 'discord.js';
 import {
-  getGuildModeration, getAllGuildSettings, setGuildSetting, setModerationField,
+  getGuildModeration, getAllGuildSettings, setGuildSetting, setGuildSettings, setModerationField,
 } from '../lib/guild-settings';
 import {
   buildSettingsPanel, applyToggleSelection, AI_FEATURES, FUN_FEATURES, type Page,
@@ -75,7 +75,7 @@ export const settingsCommand = {
           const tier = which === 'ai' ? AI_FEATURES : FUN_FEATURES;
           const sel = i as AnySelectMenuInteraction;
           const next = applyToggleSelection(getAllGuildSettings(guildId), tier, [...sel.values]);
-          for (const f of tier) setGuildSetting(guildId, f.value, next[f.value]);
+          setGuildSettings(guildId, Object.fromEntries(tier.map(f => [f.value, next[f.value]])));
         }
 
         await (i as ButtonInteraction | AnySelectMenuInteraction).update(
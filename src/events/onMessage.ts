@@ -1,273 +1,424 @@
 import { Events, Message, DMChannel, type Client } from 'discord.js';
 import { extractMetadataFromBuffer } from '../lib/metadata';
-import { addToCache } from '../lib/cache';
-import { SCAN_LIMIT_BYTES, DM_ALLOWED_USER_IDS, DM_RESPONSE_MESSAGE, ENV_MOD_DEFAULTS, GIF_SOURCE_DOMAINS } from '../lib/config';
+import { BATCH_EMOJI, NUMBER_EMOJIS, addToCache } from '../lib/cache';
+import { Semaphore } from '../lib/semaphore';
+import { ProxyDeleteWatcher } from '../lib/proxy-delete';
+import { isScannablePng, DM_ALLOWED_USER_IDS, DM_RESPONSE_MESSAGE, ENV_MOD_DEFAULTS, GIF_SOURCE_DOMAINS } from '../lib/config';
 import { getGuildSetting, getModeration } from '../lib/guild-settings';
-import { trackMessage, checkCrossPosting, isGibberish, calculateScamScore, detectDisguisedExecutable, checkEmbedImages, algoSpeakScore, instantBan, alertAdmins, isTrusted, isMediaMessage, hasHoneypotRole, checkMediaVelocity, checkMentionSpam, isRecentJoin, mediaRaidThreshold } from '../lib/security';
+import { trackMessage, checkCrossPosting, isGibberish, calculateScamScore, SCAM_BAN_SCORE, detectDisguisedExecutable, readHeader, checkEmbedImages, algoSpeakScore, instantBan, alertAdmins, isTrusted, isMediaMessage, hasHoneypotRole, checkMediaVelocity, checkMentionSpam, isRecentJoin, mediaRaidThreshold } from '../lib/security';
 import { isUserBanned, isPatternBanned, recordBan, recordPattern, checkWordPatterns } from '../lib/ban-registry';
 
-const NUMBER_EMOJIS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣'];
+// Upper bound on remembered first-attachment URLs (PluralKit double-post dedup).
+const MAX_TRACKED_URLS = 500;
 const processedUrls = new Set<string>();
 
-export function registerMessageEvents(client: Client): void {
-  client.on(Events.MessageCreate, async (message: Message) => {
-    if (message.author.bot && !message.webhookId) return;
-    if (message.author.id === client.user?.id) return;
+// Caps concurrent PNG download+parse work (one slot per image). Bursts beyond the wait
+// queue are skipped (and logged with the queue depth) rather than buffering every image.
+const metadataSemaphore = new Semaphore(2, 32);
+
+// Full PNG bodies the security pass may hold for the metadata scan, across all messages.
+// Never waited on (no queue): with every slot taken the body isn't kept, the security
+// check reads just the header and the scan downloads the image under its own slot.
+// Bounds that memory to MAX_KEPT_BODIES × SCAN_LIMIT_BYTES. Bodies are dropped the
+// moment their image is parsed or the message leaves the scan path, so slots turn over
+// at scan speed rather than message lifetime.
+const MAX_KEPT_BODIES = 4;
+const keptBodies = new Semaphore(MAX_KEPT_BODIES, 0);
+
+// Drops a message's kept bodies — one attachment's, or all of them — and frees their
+// keptBodies slots.
+function dropKept(downloaded: Map<string, Buffer>, attId?: string): void {
+  if (attId !== undefined) {
+    if (downloaded.delete(attId)) keptBodies.release();
+    return;
+  }
+  for (let i = 0; i < downloaded.size; i++) keptBodies.release();
+  downloaded.clear();
+}
 
-    // ── DM handling ─────────────────────────────────────────────────────────
-    if (message.channel instanceof DMChannel) {
-      if (!DM_ALLOWED_USER_IDS.has(message.author.id)) {
-        await message.channel.send(DM_RESPONSE_MESSAGE).catch(() => null);
-      }
-      return;
-    }
+// Per-author cap on messages being scanned at once. The global semaphore bounds total
+// work; this keeps one user's upload flood from holding every slot and filling the
+// shared queue ahead of everyone else. Entries are refcounted (holders + waiters) and
+// dropped when the user goes idle, so the map doesn't grow with every author seen.
+const USER_METADATA_CONCURRENCY = 2;
+const userMetadataSlots = new Map<string, { sem: Semaphore; refs: number }>();
+
+// Whether withUserSlot would start `userId`'s work right away. refs counts holders and
+// waiters, so below the cap a slot is free.
+function userSlotFree(userId: string): boolean {
+  return (userMetadataSlots.get(userId)?.refs ?? 0) < USER_METADATA_CONCURRENCY;
+}
 
-    if (!message.guild) return;
+async function withUserSlot<T>(userId: string, fn: () => Promise<T>): Promise<T> {
+  let slot = userMetadataSlots.get(userId);
+  if (!slot) {
+    slot = { sem: new Semaphore(USER_METADATA_CONCURRENCY), refs: 0 };
+    userMetadataSlots.set(userId, slot);
+  }
+  slot.refs++;
+  await slot.sem.acquire();
+  try {
+    return await fn();
+  } finally {
+    slot.sem.release();
+    if (--slot.refs === 0) userMetadataSlots.delete(userId);
+  }
+}
 
-    // ── Resolve this guild's moderation config (per-guild value or env fallback) ──
-    const mod = getModeration(message.guildId!, ENV_MOD_DEFAULTS);
+// Discord CDN URLs carry signature params (ex/is/hm) that change when the link is
+// re-signed; the path alone identifies the attachment, so dedup on that.
+function canonicalAttachmentUrl(url: string): string {
+  const q = url.indexOf('?');
+  return q === -1 ? url : url.slice(0, q);
+}
 
-    // ── Channel filtering (per-guild monitored channels; empty = all) ───────────
-    const channelId = ('parentId' in message.channel && message.channel.parentId)
-      ? message.channel.parentId
-      : message.channelId;
-    if (mod.monitoredChannelIds.size && !mod.monitoredChannelIds.has(channelId)) return;
+// PluralKit double-post detection: how long a message may still be deleted (proxied)
+// before its metadata is scanned, and how many unclaimed deletes to remember.
+const PROXY_WAIT_MS = 500;
+const MAX_TRACKED_DELETES = 500;
+const proxyDeletes = new ProxyDeleteWatcher(MAX_TRACKED_DELETES);
 
-    // ── Security checks (independent of the metadata toggle) ─────────────────────
-    const securityEnabled = getGuildSetting(message.guildId!, 'security', true);
+export function registerMessageEvents(client: Client): void {
+  client.on(Events.MessageDelete, (message) => {
+    proxyDeletes.noteDeleted(message.id);
+  });
 
-    if (securityEnabled && !isTrusted(message, mod)) {
-      // ── Known banned user ──────────────────────────────────────────────────
-      const knownBan = isUserBanned(message.author.id);
-      if (knownBan) {
-        await instantBan(message, `Known banned user: ${knownBan.reason}`, mod, ['In ban registry']);
-        return;
-      }
+  client.on(Events.MessageCreate, async (message: Message) => {
+    // PNG bodies the security pass kept for the metadata scan, so each attachment
+    // crosses the CDN once per message. The scan path drops them as it goes; this
+    // catches the security pass's early returns (bans, deletes).
+    const downloaded = new Map<string, Buffer>();
+    try {
+      await handleMessage(client, message, downloaded);
+    } finally {
+      dropKept(downloaded);
+    }
+  });
+}
 
-      // ── Known banned message pattern ───────────────────────────────────────
-      if (message.content) {
-        const knownPattern = isPatternBanned(message.content);
-        if (knownPattern) {
-          await instantBan(message, `Known banned pattern: ${knownPattern.reason}`, mod, ['Pattern registry match']);
-          recordBan(message.author.id, message.guildId!, `Pattern match: ${knownPattern.reason}`);
-          return;
-        }
+async function handleMessage(client: Client, message: Message, downloaded: Map<string, Buffer>): Promise<void> {
+  if (message.author.bot && !message.webhookId) return;
+  if (message.author.id === client.user?.id) return;
 
-        // ── Word pattern filter ──────────────────────────────────────────────
-        const wordMatch = checkWordPatterns(message.content);
-        if (wordMatch) {
-          if (wordMatch.action === 'ban') {
-            recordBan(message.author.id, message.guildId!, `Word pattern: ${wordMatch.reason}`);
-            await instantBan(message, `Word pattern match: ${wordMatch.reason}`, mod, [`Pattern: ${wordMatch.pattern}`]);
-            return;
-          }
-          if (wordMatch.action === 'delete') {
-            await message.delete().catch(() => null);
-            await alertAdmins(message.guild!, message.member ?? message.author as any,
-              `Word pattern match: ${wordMatch.reason}`, [`Pattern: ${wordMatch.pattern}`], 'DELETED', mod);
-            return;
-          }
-          if (wordMatch.action === 'warn') {
-            await alertAdmins(message.guild!, message.member ?? message.author as any,
-              `Word pattern match: ${wordMatch.reason}`, [`Pattern: ${wordMatch.pattern}`, `Message: ${message.content.slice(0, 100)}`], 'ALERT', mod);
-          }
-        }
-      }
+  // ── DM handling ─────────────────────────────────────────────────────────
+  if (message.channel instanceof DMChannel) {
+    if (!DM_ALLOWED_USER_IDS.has(message.author.id)) {
+      await message.channel.send(DM_RESPONSE_MESSAGE).catch(() => null);
+    }
+    return;
+  }
+
+  if (!message.guild) return;
+
+  // ── Resolve this guild's moderation config (per-guild value or env fallback) ──
+  const mod = getModeration(message.guildId!, ENV_MOD_DEFAULTS);
+
+  // ── Channel filtering (per-guild monitored channels; empty = all) ───────────
+  // Threads are checked against their parent channel. Only threads: a regular text
+  // channel's parentId is its category, which would never match a monitored channel.
+  const channelId = (message.channel.isThread() && message.channel.parentId)
+    ? message.channel.parentId
+    : message.channelId;
+  if (mod.monitoredChannelIds.size && !mod.monitoredChannelIds.has(channelId)) return;
+
+  // ── Security checks (independent of the metadata toggle) ─────────────────────
+  const securityEnabled = getGuildSetting(message.guildId!, 'security', true);
+  // Read up front: the security pass only keeps PNG bodies the metadata scan will use.
+  const metadataEnabled = getGuildSetting(message.guildId!, 'metadata', true);
+  const pngAttachments = metadataEnabled ? message.attachments.filter(isScannablePng) : null;
+
+  // PluralKit: start the proxy-delete wait now so it runs alongside the security pass
+  // instead of after it — kept bodies aren't held through a separate window, and deletes
+  // that land first are remembered by the watcher.
+  const proxyDeleted = pngAttachments?.size && !message.webhookId
+    ? proxyDeletes.waitForDelete(message.id, PROXY_WAIT_MS)
+    : null;
+
+  if (securityEnabled && !isTrusted(message, mod)) {
+    // ── Known banned user ──────────────────────────────────────────────────
+    const knownBan = isUserBanned(message.author.id);
+    if (knownBan) {
+      await instantBan(message, `Known banned user: ${knownBan.reason}`, mod, ['In ban registry']);
+      return;
+    }
 
-      trackMessage(message, GIF_SOURCE_DOMAINS);
-
-      const userHasRoles = (message.member?.roles.cache.size ?? 1) > 1;
-      const imageAttachments = message.attachments.filter(a => a.contentType?.startsWith('image/'));
-      const hasImages = imageAttachments.size > 0;
-      const isMedia = isMediaMessage(message, GIF_SOURCE_DOMAINS);
-
-      // ── Magic bytes — attachments ──────────────────────────────────────────
-      if (hasImages) {
-        for (const att of imageAttachments.values()) {
-          try {
-            const res = await fetch(att.url);
-            const buf = Buffer.from(await res.arrayBuffer());
-            // Only ban on a genuinely disguised executable. A failed/expired CDN fetch
-            // returns an HTML or JSON error body (not the user's actual image), so
-            // "unrecognised format" must NOT be a ban trigger — that false-banned a
-            // real (PluralKit-proxied) user on an HTML error page.
-            const exeReason = detectDisguisedExecutable(buf);
-            if (exeReason) {
-              await instantBan(message, exeReason, mod);
-              return;
-            }
-          } catch { /* skip on network error */ }
-        }
+    // ── Known banned message pattern ───────────────────────────────────────
+    if (message.content) {
+      const knownPattern = isPatternBanned(message.content);
+      if (knownPattern) {
+        await instantBan(message, `Known banned pattern: ${knownPattern.reason}`, mod, ['Pattern registry match']);
+        recordBan(message.author.id, message.guildId!, `Pattern match: ${knownPattern.reason}`);
+        return;
       }
 
-      // ── Magic bytes — embeds ───────────────────────────────────────────────
-      if (message.embeds.length > 0) {
-        const embedReason = await checkEmbedImages(message);
-        if (embedReason) {
-          await instantBan(message, `Malicious embed: ${embedReason}`, mod);
+      // ── Word pattern filter ──────────────────────────────────────────────
+      const wordMatch = checkWordPatterns(message.content);
+      if (wordMatch) {
+        if (wordMatch.action === 'ban') {
+          recordBan(message.author.id, message.guildId!, `Word pattern: ${wordMatch.reason}`);
+          await instantBan(message, `Word pattern match: ${wordMatch.reason}`, mod, [`Pattern: ${wordMatch.pattern}`]);
           return;
         }
-      }
-
-      // ── Algo speak detection ───────────────────────────────────────────────
-      // Only fires when combined with cross-channel posting — not on its own.
-      // Targets illegal content bots that obfuscate text to evade filters.
-      const algoScore = message.content ? algoSpeakScore(message.content) : 0;
-      if (algoScore >= 40) {
-        const crossPosts = checkCrossPosting(message);
-        if (crossPosts >= 2) {
-          const reason = `Algo speak + cross-posting (algo score: ${algoScore}, channels: ${crossPosts})`;
-          recordPattern(message.content, reason);
-          recordBan(message.author.id, message.guildId!, reason);
-          await instantBan(message, reason, mod, ['Obfuscated text', `${crossPosts} channels`, `Algo score: ${algoScore}`]);
+        if (wordMatch.action === 'delete') {
+          await message.delete().catch(() => null);
+          await alertAdmins(message.guild!, message.member ?? message.author as any,
+            `Word pattern match: ${wordMatch.reason}`, [`Pattern: ${wordMatch.pattern}`], 'DELETED', mod);
           return;
         }
-        // High score alone (heavy zalgo/ZWC) — delete and alert without banning
-        if (algoScore >= 100) {
-          await message.delete().catch(() => null);
-          await alertAdmins(message.guild, message.member ?? message.author as any,
-            `Heavy text obfuscation (score: ${algoScore})`, ['Possible evasion attempt'], 'ALERT', mod);
+        if (wordMatch.action === 'warn') {
+          await alertAdmins(message.guild!, message.member ?? message.author as any,
+            `Word pattern match: ${wordMatch.reason}`, [`Pattern: ${wordMatch.pattern}`, `Message: ${message.content.slice(0, 100)}`], 'ALERT', mod);
         }
       }
+    }
 
-      // ── Media cross-post velocity ──────────────────────────────────────────
-      // Runs for ANY media (uploads OR GIF links). Two tracks: identical reposts
-      // (low bar) and any-media bursts (catches different GIFs). Honeypot role
-      // escalates per the configured mode.
-      if (isMedia) {
-        const { sameChannels, mediaChannels } = checkMediaVelocity(message, mod.mediaSpamWindowSec);
-
-        // Honeypot escalation
-        if (hasHoneypotRole(message, mod) && mod.honeypotMode !== 'off') {
-          if (mod.honeypotMode === 'strict' || mediaChannels >= 2) {
-            const reason = `Honeypot role + media (${mod.honeypotMode})`;
-            recordBan(message.author.id, message.guildId!, reason);
-            await instantBan(message, reason, mod, ['Honeypot/catcher role', `mode: ${mod.honeypotMode}`]);
-            return;
+    trackMessage(message, GIF_SOURCE_DOMAINS);
+
+    const userHasRoles = (message.member?.roles.cache.size ?? 1) > 1;
+    const imageAttachments = message.attachments.filter(a => a.contentType?.startsWith('image/'));
+    const hasImages = imageAttachments.size > 0;
+    const isMedia = isMediaMessage(message, GIF_SOURCE_DOMAINS);
+
+    // ── Magic bytes — attachments ──────────────────────────────────────────
+    // Downloads are independent, so fetch them concurrently: N images cost ~1 RTT
+    // before the ban decision instead of N.
+    if (hasImages) {
+      const exeReasons = await Promise.all(imageAttachments.map(async (att) => {
+        try {
+          const res = await fetch(att.url);
+          // Only PNGs the metadata scan will parse need the whole body, kept for reuse
+          // below while a keptBodies slot is free; for everything else the executable
+          // check needs just the first bytes, so stop the download there. Not kept when
+          // the author's scans are already at their cap: the body would sit in the
+          // global pool while this message queues behind the author's own.
+          const keep = res.ok && metadataEnabled && isScannablePng(att)
+            && userSlotFree(message.author.id) && await keptBodies.acquire();
+          let buf: Buffer;
+          if (keep) {
+            try {
+              buf = Buffer.from(await res.arrayBuffer());
+            } catch (err) {
+              keptBodies.release();
+              throw err;
+            }
+            downloaded.set(att.id, buf);
+          } else {
+            buf = await readHeader(res);
           }
+          // Only ban on a genuinely disguised executable. A failed/expired CDN fetch
+          // returns an HTML or JSON error body (not the user's actual image), so
+          // "unrecognised format" must NOT be a ban trigger — that false-banned a
+          // real (PluralKit-proxied) user on an HTML error page.
+          return detectDisguisedExecutable(buf);
+        } catch {
+          return null; // skip on network error
         }
+      }));
+      const exeReason = exeReasons.find(r => r !== null);
+      if (exeReason) {
+        await instantBan(message, exeReason, mod);
+        return;
+      }
+    }
 
-        // Identity track — same file reposted across channels (low bar)
-        if (sameChannels >= mod.mediaSpamSameChannels) {
-          const reason = `Repost spam (same media in ${sameChannels} channels / ${mod.mediaSpamWindowSec}s)`;
-          if (message.content) recordPattern(message.content, reason);
-          recordBan(message.author.id, message.guildId!, reason);
-          await instantBan(message, reason, mod, [`${sameChannels} channels`, 'Identical media']);
-          return;
-        }
-
-        // Raid fast path — a direct-uploaded flagged type (default image/gif) from a
-        // recently-joined member lowers the cross-channel bar. Legit GIFs arrive as
-        // Tenor/Giphy/Klipy LINKS, not uploads, and established members keep the normal
-        // threshold. Size is NOT used: abuse GIFs match normal art (PNG) sizes, so a
-        // size bar punished safe art posters instead of the raider. Checks ALL
-        // attachments so configured types like video/mp4 are honoured.
-        const hasRiskyUpload = [...message.attachments.values()].some(
-          a => a.contentType != null && mod.largeMediaTypes.has(a.contentType.toLowerCase()),
-        );
-        const recentJoin = isRecentJoin(message.member?.joinedTimestamp);
-        const mediaThreshold = mediaRaidThreshold(mod.mediaSpamChannels, hasRiskyUpload, recentJoin);
-
-        // Media-type track — any media across channels (catches different GIFs)
-        if (mediaChannels >= mediaThreshold) {
-          const raid = hasRiskyUpload && recentJoin;
-          const reason = `Media spam (${mediaChannels} channels / ${mod.mediaSpamWindowSec}s${raid ? ', new-member GIF upload' : ''})`;
-          recordBan(message.author.id, message.guildId!, reason);
-          await instantBan(message, reason, mod, [
-            `${mediaChannels} channels`,
-            hasRiskyUpload ? 'Direct-uploaded flagged type' : 'Mixed media',
-            recentJoin ? 'Recently joined' : 'Established member',
-          ]);
-          return;
-        }
-
-        // Standalone single-message case: 4+ images + no roles + gibberish. Lower-
-        // confidence heuristic, so intentionally NOT written to the cross-server ban
-        // registry (no recordBan) — unlike the velocity tracks above.
-        if (imageAttachments.size >= 4 && !userHasRoles && isGibberish(message.content, false, hasImages)) {
-          await instantBan(message, 'Screenshot spam + gibberish', mod,
-            [`${imageAttachments.size} images`, 'No roles', 'Gibberish text']);
-          return;
-        }
+    // ── Magic bytes — embeds ───────────────────────────────────────────────
+    if (message.embeds.length > 0) {
+      const embedReason = await checkEmbedImages(message);
+      if (embedReason) {
+        await instantBan(message, `Malicious embed: ${embedReason}`, mod);
+        return;
       }
+    }
 
-      // ── Wallet scam scoring ────────────────────────────────────────────────
-      const [score, reasons] = calculateScamScore(message, mod);
-      if (score >= 100) {
-        recordPattern(message.content, `Wallet scam score ${score}`);
-        recordBan(message.author.id, message.guildId!, `Wallet scam score ${score}`);
-        await instantBan(message, `Wallet scam (score: ${score})`, mod, reasons);
+    // ── Algo speak detection ───────────────────────────────────────────────
+    // Only fires when combined with cross-channel posting — not on its own.
+    // Targets illegal content bots that obfuscate text to evade filters.
+    const algoScore = message.content ? algoSpeakScore(message.content) : 0;
+    if (algoScore >= 40) {
+      const crossPosts = checkCrossPosting(message);
+      if (crossPosts >= 2) {
+        const reason = `Algo speak + cross-posting (algo score: ${algoScore}, channels: ${crossPosts})`;
+        recordPattern(message.content, reason);
+        recordBan(message.author.id, message.guildId!, reason);
+        await instantBan(message, reason, mod, ['Obfuscated text', `${crossPosts} channels`, `Algo score: ${algoScore}`]);
         return;
       }
-      if (score >= 75) {
+      // High score alone (heavy zalgo/ZWC) — delete and alert without banning
+      if (algoScore >= 100) {
         await message.delete().catch(() => null);
         await alertAdmins(message.guild, message.member ?? message.author as any,
-          `Suspicious message (score: ${score})`, reasons, 'DELETED', mod);
-        return;
+          `Heavy text obfuscation (score: ${algoScore})`, ['Possible evasion attempt'], 'ALERT', mod);
       }
+    }
 
-      // ── Mention spam detection ─────────────────────────────────────────────
-      if (message.mentions) {
-        const [mentionScore, mentionReasons] = checkMentionSpam(message);
-        if (mentionScore >= 100) {
-          const r = `Mention spam (score: ${mentionScore})`;
-          recordPattern(message.content, r);
-          recordBan(message.author.id, message.guildId!, r);
-          await instantBan(message, r, mod, mentionReasons);
-          return;
-        }
-        if (mentionScore >= 50) {
-          await message.delete().catch(() => null);
-          await alertAdmins(message.guild, message.member ?? message.author as any,
-            `Mention spam (score: ${mentionScore})`, mentionReasons, 'DELETED', mod);
+    // ── Media cross-post velocity ──────────────────────────────────────────
+    // Runs for ANY media (uploads OR GIF links). Two tracks: identical reposts
+    // (low bar) and any-media bursts (catches different GIFs). Honeypot role
+    // escalates per the configured mode.
+    if (isMedia) {
+      const { sameChannels, mediaChannels } = checkMediaVelocity(message, mod.mediaSpamWindowSec);
+
+      // Honeypot escalation
+      if (hasHoneypotRole(message, mod) && mod.honeypotMode !== 'off') {
+        if (mod.honeypotMode === 'strict' || mediaChannels >= 2) {
+          const reason = `Honeypot role + media (${mod.honeypotMode})`;
+          recordBan(message.author.id, message.guildId!, reason);
+          await instantBan(message, reason, mod, ['Honeypot/catcher role', `mode: ${mod.honeypotMode}`]);
           return;
         }
       }
-    }
 
-    // ── PNG metadata processing (independent of security) ───────────────────────
-    if (!getGuildSetting(message.guildId!, 'metadata', true)) return;
-    const pngAttachments = message.attachments.filter(
-      a => a.name.toLowerCase().endsWith('.png') && a.size < SCAN_LIMIT_BYTES
-    );
-    if (pngAttachments.size === 0) return;
+      // Identity track — same file reposted across channels (low bar)
+      if (sameChannels >= mod.mediaSpamSameChannels) {
+        const reason = `Repost spam (same media in ${sameChannels} channels / ${mod.mediaSpamWindowSec}s)`;
+        if (message.content) recordPattern(message.content, reason);
+        recordBan(message.author.id, message.guildId!, reason);
+        await instantBan(message, reason, mod, [`${sameChannels} channels`, 'Identical media']);
+        return;
+      }
 
-    const first = pngAttachments.first()!;
+      // Raid fast path — a direct-uploaded flagged type (default image/gif) from a
+      // recently-joined member lowers the cross-channel bar. Legit GIFs arrive as
+      // Tenor/Giphy/Klipy LINKS, not uploads, and established members keep the normal
+      // threshold. Size is NOT used: abuse GIFs match normal art (PNG) sizes, so a
+      // size bar punished safe art posters instead of the raider. Checks ALL
+      // attachments so configured types like video/mp4 are honoured.
+      const hasRiskyUpload = [...message.attachments.values()].some(
+        a => a.contentType != null && mod.largeMediaTypes.has(a.contentType.toLowerCase()),
+      );
+      const recentJoin = isRecentJoin(message.member?.joinedTimestamp);
+      const mediaThreshold = mediaRaidThreshold(mod.mediaSpamChannels, hasRiskyUpload, recentJoin);
+
+      // Media-type track — any media across channels (catches different GIFs)
+      if (mediaChannels >= mediaThreshold) {
+        const raid = hasRiskyUpload && recentJoin;
+        const reason = `Media spam (${mediaChannels} channels / ${mod.mediaSpamWindowSec}s${raid ? ', new-member GIF upload' : ''})`;
+        recordBan(message.author.id, message.guildId!, reason);
+        await instantBan(message, reason, mod, [
+          `${mediaChannels} channels`,
+          hasRiskyUpload ? 'Direct-uploaded flagged type' : 'Mixed media',
+          recentJoin ? 'Recently joined' : 'Established member',
+        ]);
+        return;
+      }
 
-    // PluralKit: wait briefly then confirm message still exists
-    if (!message.webhookId) {
-      await new Promise(r => setTimeout(r, 500));
-      const stillThere = await message.channel.messages.fetch(message.id).catch(() => null);
-      if (!stillThere) return;
+      // Standalone single-message case: 4+ images + no roles + gibberish. Lower-
+      // confidence heuristic, so intentionally NOT written to the cross-server ban
+      // registry (no recordBan) — unlike the velocity tracks above.
+      if (imageAttachments.size >= 4 && !userHasRoles && isGibberish(message.content, false, hasImages)) {
+        await instantBan(message, 'Screenshot spam + gibberish', mod,
+          [`${imageAttachments.size} images`, 'No roles', 'Gibberish text']);
+        return;
+      }
     }
 
-    if (processedUrls.has(first.url)) return;
-    processedUrls.add(first.url);
-    if (processedUrls.size > 500) processedUrls.clear();
-
-    try {
-      const imagesWithMeta: Array<{ name: string; url: string; meta: Record<string, any> }> = [];
+    // ── Wallet scam scoring ────────────────────────────────────────────────
+    const [score, reasons] = calculateScamScore(message, mod);
+    if (score >= SCAM_BAN_SCORE) {
+      recordPattern(message.content, `Wallet scam score ${score}`);
+      recordBan(message.author.id, message.guildId!, `Wallet scam score ${score}`);
+      await instantBan(message, `Wallet scam (score: ${score})`, mod, reasons);
+      return;
+    }
+    if (score >= 75) {
+      await message.delete().catch(() => null);
+      await alertAdmins(message.guild, message.member ?? message.author as any,
+        `Suspicious message (score: ${score})`, reasons, 'DELETED', mod);
+      return;
+    }
 
-      for (const att of pngAttachments.values()) {
-        const res = await fetch(att.url);
-        const buf = Buffer.from(await res.arrayBuffer());
+    // ── Mention spam detection ─────────────────────────────────────────────
+    if (message.mentions) {
+      const [mentionScore, mentionReasons] = checkMentionSpam(message);
+      if (mentionScore >= 100) {
+        const r = `Mention spam (score: ${mentionScore})`;
+        recordPattern(message.content, r);
+        recordBan(message.author.id, message.guildId!, r);
+        await instantBan(message, r, mod, mentionReasons);
+        return;
+      }
+      if (mentionScore >= 50) {
+        await message.delete().catch(() => null);
+        await alertAdmins(message.guild, message.member ?? message.author as any,
+          `Mention spam (score: ${mentionScore})`, mentionReasons, 'DELETED', mod);
+        return;
+      }
+    }
+  }
+
+  // ── PNG metadata processing (independent of security) ───────────────────────
+  if (!pngAttachments?.size) return;
+
+  const first = pngAttachments.first()!;
+
+  // PluralKit: skip originals that get deleted (proxied) within the wait window
+  if (proxyDeleted && await proxyDeleted) {
+    dropKept(downloaded);
+    return;
+  }
+
+  const firstKey = canonicalAttachmentUrl(first.url);
+  if (processedUrls.has(firstKey)) {
+    dropKept(downloaded);
+    return;
+  }
+  processedUrls.add(firstKey);
+  // Evict oldest-first (Set iterates in insertion order). Clearing the whole set would
+  // briefly re-enable double-processing of every in-flight PluralKit repost.
+  while (processedUrls.size > MAX_TRACKED_URLS) {
+    const oldest = processedUrls.values().next().value;
+    if (oldest === undefined) break;
+    processedUrls.delete(oldest);
+  }
+
+  try {
+    // One slot per image (not per message), so a message's images download and parse
+    // in parallel while the semaphore still caps total in-flight work across messages.
+    // If the queue refuses any image the whole message is skipped, as before: reacting
+    // to a subset would leave emoji N pointing at no attachment the user can identify.
+    let busy = false;
+    // Waiting behind the author's own scans would park kept bodies in the global pool.
+    if (!userSlotFree(message.author.id)) dropKept(downloaded);
+    const scanned = await withUserSlot(message.author.id, () => Promise.all(pngAttachments.map(async (att) => {
+      if (!(await metadataSemaphore.acquire())) {
+        busy = true;
+        dropKept(downloaded, att.id);
+        return null;
+      }
+      try {
+        if (busy) return null; // a sibling was refused; don't download for nothing
+        const buf = downloaded.get(att.id) ?? Buffer.from(await (await fetch(att.url)).arrayBuffer());
         const result = await extractMetadataFromBuffer(buf, 'image/png', att.name, att.size, new Date().toISOString());
-        if (result.ai && Object.keys(result.ai).length > 0) {
-          imagesWithMeta.push({ name: att.name, url: att.url, meta: result });
-        }
+        if (!result.ai || Object.keys(result.ai).length === 0) return null;
+        return { name: att.name, url: att.url, meta: result as Record<string, any> };
+      } finally {
+        dropKept(downloaded, att.id);
+        metadataSemaphore.release();
       }
+    })));
+    if (busy) {
+      console.warn(`[metadata] busy (${metadataSemaphore.pending} queued) — skipping message ${message.id}`);
+      processedUrls.delete(firstKey); // unscanned, so a later copy (e.g. a proxy repost) may scan it
+      return;
+    }
+    // Promise.all keeps attachment order, so emoji N still maps to the Nth image.
+    const imagesWithMeta = scanned.filter((x): x is NonNullable<typeof x> => x !== null);
 
-      if (imagesWithMeta.length === 0) return;
+    if (imagesWithMeta.length === 0) return;
 
-      addToCache(message.id, imagesWithMeta);
+    addToCache(message.id, imagesWithMeta);
 
-      if (imagesWithMeta.length <= 5) {
-        for (let i = 0; i < imagesWithMeta.length; i++) await message.react(NUMBER_EMOJIS[i]);
-      } else {
-        await message.react('📦');
+    if (imagesWithMeta.length <= 5) {
+      // Issue all reactions at once; discord.js's REST queue serialises the shared
+      // reaction route in submission order, so they still appear as 1, 2, 3…
+      const results = await Promise.allSettled(imagesWithMeta.map((_, i) => message.react(NUMBER_EMOJIS[i])));
+      for (const r of results) {
+        if (r.status === 'rejected') console.warn(`[metadata] react failed on ${message.id}:`, r.reason);
       }
-    } catch (err) {
-      console.error('onMessage error:', err);
+    } else {
+      await message.react(BATCH_EMOJI);
     }
-  });
+  } catch (err) {
+    console.error('onMessage error:', err);
+  }
 }
@@ -1,62 +1,103 @@
-import { AttachmentBuilder, Events, GuildTextBasedChannel, type Client } from 'discord.js';
-import { getFromCache } from '../lib/cache';
+import { setImmediate as yieldToEventLoop } from 'timers/promises';
+import { AttachmentBuilder, DiscordAPIError, Events, GuildTextBasedChannel, RESTJSONErrorCodes, type Client, type MessageReaction, type PartialMessageReaction, type PartialUser, type User } from 'discord.js';
+import { BATCH_EMOJI, NUMBER_EMOJI_INDEX, getFromCache } from '../lib/cache';
 import { formatMetadataEmbed } from '../lib/format';
 
-const NUMBER_EMOJIS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣'];
+// Serialized workflow per parsed graph. The graph lives in the metadata cache and never
+// changes once parsed, so every later click on the same image reuses the bytes instead
+// of pretty-printing the whole graph again. Weak, so entries go when the cache evicts.
+const workflowJson = new WeakMap<object, Buffer>();
+
+function workflowBytes(wf: unknown): Buffer {
+  if (typeof wf !== 'object' || wf === null) return Buffer.from(JSON.stringify(wf, null, 2), 'utf8');
+  let buf = workflowJson.get(wf);
+  if (!buf) {
+    buf = Buffer.from(JSON.stringify(wf, null, 2), 'utf8');
+    workflowJson.set(wf, buf);
+  }
+  return buf;
+}
 
 function workflowAttachment(meta: Record<string, any>, imageName: string): AttachmentBuilder | null {
   const wf = meta.ai?.comfyui_workflow;
   if (!wf) return null;
-  const json = JSON.stringify(wf, null, 2);
   const name = imageName.replace(/\.[^.]+$/i, '_workflow.json');
-  return new AttachmentBuilder(Buffer.from(json, 'utf8'), { name });
+  return new AttachmentBuilder(workflowBytes(wf), { name });
 }
 
+// Routine failures when replying to a reaction: the message was deleted, or the bot
+// can't post in that channel. Logged as one line; anything else gets a full stack.
+const EXPECTED_REPLY_ERRORS: ReadonlySet<number | string> = new Set([
+  RESTJSONErrorCodes.UnknownMessage,
+  RESTJSONErrorCodes.UnknownChannel,
+  RESTJSONErrorCodes.MissingAccess,
+  RESTJSONErrorCodes.MissingPermissions,
+]);
+
 export function registerReactionEvents(client: Client): void {
-  client.on(Events.MessageReactionAdd, async (reaction, user) => {
-    if (user.bot) return;
-
-    const emoji = reaction.emoji.name ?? '';
-    const isNumbered = NUMBER_EMOJIS.includes(emoji);
-    const isBatch = emoji === '📦';
-    if (!isNumbered && !isBatch) return;
-
-    const images = getFromCache(reaction.message.id);
-    if (!images) return;
-
-    if (isBatch) {
-      const embeds = images.map((img, i) => formatMetadataEmbed(img.meta, img.name, i + 1, images.length));
-      const workflows = images
-        .map(img => workflowAttachment(img.meta, img.name))
-        .filter((a): a is AttachmentBuilder => a !== null);
-
-      // Discord allows max 10 embeds and 10 files per message
-      const first = embeds.slice(0, 10);
-      const firstFiles = workflows.slice(0, 10);
-      await reaction.message.reply({ embeds: first, files: firstFiles, allowedMentions: { repliedUser: false } });
-
-      const channel = reaction.message.channel as GuildTextBasedChannel;
-      for (let i = 10; i < Math.max(embeds.length, workflows.length); i += 10) {
-        const batchEmbeds = embeds.slice(i, i + 10);
-        const batchFiles = workflows.slice(i, i + 10);
-        await channel.send({
-          ...(batchEmbeds.length ? { embeds: batchEmbeds } : {}),
-          ...(batchFiles.length ? { files: batchFiles } : {}),
-        });
+  client.on(Events.MessageReactionAdd, (reaction, user) => {
+    handleReaction(reaction, user).catch((err) => {
+      if (err instanceof DiscordAPIError && EXPECTED_REPLY_ERRORS.has(err.code)) {
+        console.warn(`[reaction] ${err.message} (message ${reaction.message.id})`);
+      } else {
+        console.error('onReaction error:', err);
       }
-      return;
+    });
+  });
+}
+
+async function handleReaction(
+  reaction: MessageReaction | PartialMessageReaction,
+  user: User | PartialUser,
+): Promise<void> {
+  if (user.bot) return;
+
+  const emoji = reaction.emoji.name ?? '';
+  const index = NUMBER_EMOJI_INDEX.get(emoji);
+  const isBatch = emoji === BATCH_EMOJI;
+  if (index === undefined && !isBatch) return;
+
+  const images = getFromCache(reaction.message.id);
+  if (!images) return;
+
+  if (isBatch) {
+    const embeds = images.map((img, i) => formatMetadataEmbed(img.meta, img.name, i + 1, images.length));
+    // Pretty-printing a large ComfyUI graph is synchronous and can take tens of ms;
+    // yield between workflows so a 📦 on a big batch can't stall the gateway
+    // heartbeat for the sum of them.
+    const workflows: AttachmentBuilder[] = [];
+    for (const img of images) {
+      const att = workflowAttachment(img.meta, img.name);
+      if (!att) continue;
+      workflows.push(att);
+      await yieldToEventLoop();
     }
 
-    const index = NUMBER_EMOJIS.indexOf(emoji);
-    if (index >= images.length) return;
+    // Discord allows max 10 embeds and 10 files per message
+    const first = embeds.slice(0, 10);
+    const firstFiles = workflows.slice(0, 10);
+    await reaction.message.reply({ embeds: first, files: firstFiles, allowedMentions: { repliedUser: false } });
 
-    const img = images[index];
-    const embed = formatMetadataEmbed(img.meta, img.name, index + 1, images.length);
-    const attachment = workflowAttachment(img.meta, img.name);
-    await reaction.message.reply({
-      embeds: [embed],
-      ...(attachment ? { files: [attachment] } : {}),
-      allowedMentions: { repliedUser: false },
-    });
+    const channel = reaction.message.channel as GuildTextBasedChannel;
+    for (let i = 10; i < Math.max(embeds.length, workflows.length); i += 10) {
+      const batchEmbeds = embeds.slice(i, i + 10);
+      const batchFiles = workflows.slice(i, i + 10);
+      await channel.send({
+        ...(batchEmbeds.length ? { embeds: batchEmbeds } : {}),
+        ...(batchFiles.length ? { files: batchFiles } : {}),
+      });
+    }
+    return;
+  }
+
+  if (index === undefined || index >= images.length) return;
+
+  const img = images[index];
+  const embed = formatMetadataEmbed(img.meta, img.name, index + 1, images.length);
+  const attachment = workflowAttachment(img.meta, img.name);
+  await reaction.message.reply({
+    embeds: [embed],
+    ...(attachment ? { files: [attachment] } : {}),
+    allowedMentions: { repliedUser: false },
   });
 }
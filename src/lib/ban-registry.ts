@@ -1,6 +1,6 @@
 import fs from 'fs';
 import crypto from 'crypto';
-import { dataFile, writeJsonAtomic } from './paths';
+import { dataFile, cachedJsonStore } from './paths';
 
 const FILE = dataFile('ban-registry.json');
 
@@ -40,7 +40,11 @@ interface Registry {
 
 // ── Persistence ───────────────────────────────────────────────────────────────
 
-function load(): Registry {
+// Every guild message checks the user, pattern and word lists, so the registry is
+// cached rather than read and parsed up to three times per message.
+const { load, save } = cachedJsonStore(FILE, readRegistry);
+
+function readRegistry(): Registry {
   if (!fs.existsSync(FILE)) return { users: [], patterns: [], wordPatterns: [] };
   try {
     const data = JSON.parse(fs.readFileSync(FILE, 'utf8'));
@@ -50,10 +54,6 @@ function load(): Registry {
   catch { return { users: [], patterns: [], wordPatterns: [] }; }
 }
 
-function save(data: Registry): void {
-  writeJsonAtomic(FILE, data);
-}
-
 // ── Pattern fingerprinting ────────────────────────────────────────────────────
 // Normalise before hashing so minor variations of the same message still match:
 // - collapse whitespace
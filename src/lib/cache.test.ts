@@ -0,0 +1,25 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { addToCache, getFromCache, metadataCache } from './cache';
+
+const img = (name: string) => [{ name, url: `https://cdn/${name}`, meta: {} }];
+
+describe('metadata cache', () => {
+  beforeEach(() => { metadataCache.clear(); });
+
+  it('evicts the least recently used message once full', () => {
+    for (let i = 0; i < 100; i++) addToCache(`m${i}`, img(`${i}.png`));
+    getFromCache('m0'); // touch: m0 is now most recent
+    addToCache('m100', img('100.png'));
+    expect(metadataCache.size).toBe(100);
+    expect(getFromCache('m0')).toBeDefined();
+    expect(getFromCache('m1')).toBeUndefined();
+  });
+
+  it('re-adding an existing message does not evict another entry', () => {
+    for (let i = 0; i < 100; i++) addToCache(`m${i}`, img(`${i}.png`));
+    addToCache('m50', img('again.png'));
+    expect(metadataCache.size).toBe(100);
+    expect(getFromCache('m0')).toBeDefined();
+    expect(getFromCache('m50')?.[0].name).toBe('again.png');
+  });
+});
@@ -4,19 +4,35 @@ export interface CachedImage {
   meta: Record<string, any>;
 }
 
+// Reactions the bot adds to a scanned message: one number per image (up to 5) or a
+// single batch emoji. Shared so onMessage and onReaction can't drift apart, with a
+// reverse index so the reaction handler maps emoji → image in O(1).
+export const NUMBER_EMOJIS: readonly string[] = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣'];
+export const NUMBER_EMOJI_INDEX: ReadonlyMap<string, number> = new Map(NUMBER_EMOJIS.map((e, i) => [e, i]));
+export const BATCH_EMOJI = '📦';
+
+// LRU over Map insertion order: reads re-insert the entry so messages people are still
+// reacting to stay warm, and eviction drops from the front (least recently used).
 const cache = new Map<string, CachedImage[]>();
 const MAX_ENTRIES = 100;
 
 export function addToCache(messageId: string, images: CachedImage[]): void {
-  if (cache.size >= MAX_ENTRIES) {
+  cache.delete(messageId);
+  cache.set(messageId, images);
+  while (cache.size > MAX_ENTRIES) {
     const oldest = cache.keys().next().value;
-    if (oldest) cache.delete(oldest);
+    if (oldest === undefined) break;
+    cache.delete(oldest);
   }
-  cache.set(messageId, images);
 }
 
 export function getFromCache(messageId: string): CachedImage[] | undefined {
-  return cache.get(messageId);
+  const images = cache.get(messageId);
+  if (images) {
+    cache.delete(messageId);
+    cache.set(messageId, images);
+  }
+  return images;
 }
 
 export { cache as metadataCache };
@@ -1,7 +1,10 @@
 import 'dotenv/config';
 import fs from 'fs';
+import type { GoogleGenAI } from '@google/genai';
+import type Anthropic from '@anthropic-ai/sdk';
+import type Groq from 'groq-sdk';
 import type { EnvModDefaults } from './settings-types';
-import { RateLimiter } from './rate-limiter';
+import { RateLimiter, SlidingWindowLimiter } from './rate-limiter';
 import { CROSS_POST_WINDOW } from './security';
 
 function parseIdList(envVar: string | undefined): Set<string> {
@@ -51,6 +54,13 @@ export const MONITORED_CHANNEL_IDS = parseIdList(process.env.MONITORED_CHANNEL_I
 export const SCAN_LIMIT_BYTES = parseInt(cfg('SCAN_LIMIT_BYTES', 'SCAN_LIMIT_BYTES', String(10 * 1024 * 1024)));
 export const REACT_ON_NO_METADATA = cfg('REACT_ON_NO_METADATA', 'REACT_ON_NO_METADATA', 'false') === 'true';
 
+// Attachments the metadata scanners will download: PNG by name (case-insensitive) and
+// under the scan size cap. Size is checked first — it's a free number compare and
+// rules out oversized files without lowercasing the name.
+export function isScannablePng(att: { name: string; size: number }): boolean {
+  return att.size < SCAN_LIMIT_BYTES && att.name.toLowerCase().endsWith('.png');
+}
+
 // ── Security ──────────────────────────────────────────────────────────────────
 export const CATCHER_ROLE_ID = process.env.CATCHER_ROLE_ID ?? fileConfig['CATCHER_ROLE_ID'] ?? '';
 export const TRUSTED_USER_IDS = parseIdList(process.env.TRUSTED_USER_IDS);
@@ -123,7 +133,10 @@ if (GROQ_API_KEY) AVAILABLE_PROVIDERS.push('groq');
 if (ANTHROPIC_API_KEY) AVAILABLE_PROVIDERS.push('claude');
 if (GEMINI_API_KEY) AVAILABLE_PROVIDERS.push('gemini');
 
-export const LLM_PROVIDER_PRIORITY = rawPriority.filter(p => AVAILABLE_PROVIDERS.includes(p));
+// Set view for membership checks; the array keeps detection order for iteration.
+export const AVAILABLE_PROVIDER_SET: ReadonlySet<string> = new Set(AVAILABLE_PROVIDERS);
+
+export const LLM_PROVIDER_PRIORITY = rawPriority.filter(p => AVAILABLE_PROVIDER_SET.has(p));
 
 // ── R2 ────────────────────────────────────────────────────────────────────────
 export const R2_ACCOUNT_ID = process.env.R2_ACCOUNT_ID ?? '';
@@ -135,14 +148,33 @@ export const R2_ENABLED = !!(R2_ACCOUNT_ID && R2_ACCESS_KEY_ID && R2_SECRET_ACCE
 export const SUPPORTER_ROLE_IDS = parseIdList(process.env.SUPPORTER_ROLE_IDS);
 
 // ── Clients ───────────────────────────────────────────────────────────────────
-import { GoogleGenAI } from '@google/genai';
-import Anthropic from '@anthropic-ai/sdk';
-import Groq from 'groq-sdk';
+// Each SDK is required only when its key is set, so a deployment that runs without a
+// provider doesn't pay that SDK's module-load time and memory at startup. The type
+// imports above are erased at compile time; these loaders are the only runtime loads.
+function loadGemini(): typeof import('@google/genai') {
+  return require('@google/genai');
+}
+
+function loadAnthropic(): typeof import('@anthropic-ai/sdk') {
+  return require('@anthropic-ai/sdk');
+}
+
+function loadGroq(): typeof import('groq-sdk') {
+  return require('groq-sdk');
+}
 
-export const geminiClient = GEMINI_API_KEY ? new GoogleGenAI({ apiKey: GEMINI_API_KEY }) : null;
-export const claudeClient = ANTHROPIC_API_KEY ? new Anthropic({ apiKey: ANTHROPIC_API_KEY }) : null;
-export const groqClient   = GROQ_API_KEY ? new Groq({ apiKey: GROQ_API_KEY }) : null;
+export const geminiClient: GoogleGenAI | null = GEMINI_API_KEY
+  ? new (loadGemini().GoogleGenAI)({ apiKey: GEMINI_API_KEY })
+  : null;
+export const claudeClient: Anthropic | null = ANTHROPIC_API_KEY
+  ? new (loadAnthropic().default)({ apiKey: ANTHROPIC_API_KEY })
+  : null;
+export const groqClient: Groq | null = GROQ_API_KEY
+  ? new (loadGroq().default)({ apiKey: GROQ_API_KEY })
+  : null;
 
 // ── Rate limiters ─────────────────────────────────────────────────────────────
-export const rateLimiter = new RateLimiter(5, 30);
+// Metadata path is lenient (5/30s) but bursty, so it uses the sliding-window counter
+// to smooth the fixed-window boundary burst.
+export const rateLimiter = new SlidingWindowLimiter(5, 30);
 export const geminiRateLimiter = new RateLimiter(1, 10);
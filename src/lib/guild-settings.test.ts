@@ -5,8 +5,8 @@ import path from 'path';
 import { migrateGuildEntry, resolveModeration, getModeration } from './guild-settings';
 import type { EnvModDefaults } from './settings-types';
 import {
-  getGuildSetting, setGuildSetting, getAllGuildSettings,
-  getGuildModeration, setModerationField,
+  getGuildSetting, setGuildSetting, setGuildSettings, getAllGuildSettings,
+  getGuildModeration, setModerationField, setModerationFields,
 } from './guild-settings';
 
 let tmp: string;
@@ -114,6 +114,25 @@ describe('toggle store', () => {
     expect(getGuildSetting('g1', 'security')).toBe(true);
   });
 
+  it('picks up an external edit made after a cached read', () => {
+    setGuildSetting('g1', 'ask', true);
+    expect(getGuildSetting('g1', 'ask')).toBe(true);
+    fs.writeFileSync(tmp, JSON.stringify({ guilds: { g1: { toggles: { ask: false, coder: true }, moderation: {} } } }));
+    expect(getGuildSetting('g1', 'ask')).toBe(false);
+  });
+
+  it('reflects a set in the merged toggles read before it', () => {
+    expect(getAllGuildSettings('g1').ask).toBe(false);
+    setGuildSetting('g1', 'ask', true);
+    expect(getAllGuildSettings('g1').ask).toBe(true);
+    expect(getGuildSetting('g1', 'ask')).toBe(true);
+  });
+
+  it('returns a copy from getAllGuildSettings', () => {
+    getAllGuildSettings('g1').ask = true;
+    expect(getGuildSetting('g1', 'ask')).toBe(false);
+  });
+
   it('writes atomically (no leftover temp file)', () => {
     setGuildSetting('g1', 'ask', true);
     expect(fs.existsSync(tmp)).toBe(true);
@@ -135,6 +154,21 @@ describe('moderation store', () => {
     setModerationField('g1', 'trustedRoleIds', ['r1', 'r2']);
     expect(getGuildModeration('g1').trustedRoleIds).toEqual(['r1', 'r2']);
   });
+
+  it('sets several fields in one call without touching the rest', () => {
+    setModerationField('g1', 'alertChannelId', 'chan-1');
+    setModerationFields('g1', { mediaSpamChannels: 3, mediaSpamWindowSec: 60 });
+    expect(getGuildModeration('g1')).toEqual({ alertChannelId: 'chan-1', mediaSpamChannels: 3, mediaSpamWindowSec: 60 });
+  });
+});
+
+describe('setGuildSettings', () => {
+  it('writes several toggles at once', () => {
+    setGuildSettings('g1', { ask: true, coder: true });
+    expect(getGuildSetting('g1', 'ask')).toBe(true);
+    expect(getGuildSetting('g1', 'coder')).toBe(true);
+    expect(getGuildSetting('g1', 'metadata')).toBe(true); // untouched default
+  });
 });
 
 describe('getModeration', () => {
@@ -156,6 +190,27 @@ describe('getModeration', () => {
     expect([...r.alertChannelIds]).toEqual(['guild-alert']);
     expect([...r.trustedUserIds]).toEqual(['env-user']); // fell back to env
   });
+
+  it('reuses the resolved config until the guild is changed', () => {
+    const env: EnvModDefaults = {
+      alertChannelIds: new Set(['env-alert']),
+      trustedRoleIds: new Set(),
+      trustedUserIds: new Set(),
+      monitoredChannelIds: new Set(),
+      catcherRoleId: null,
+      mediaSpamChannels: 4,
+      mediaSpamSameChannels: 3,
+      mediaSpamWindowSec: 120,
+      largeMediaTypes: new Set(),
+      honeypotMode: 'off',
+    };
+    const first = getModeration('g1', env);
+    expect(getModeration('g1', env)).toBe(first);
+    setModerationField('g1', 'alertChannelId', 'guild-alert');
+    const next = getModeration('g1', env);
+    expect(next).not.toBe(first);
+    expect([...next.alertChannelIds]).toEqual(['guild-alert']);
+  });
 });
 
 describe('resolveModeration — media-spam fields', () => {
@@ -1,5 +1,5 @@
 import fs from 'fs';
-import { dataFile, writeJsonAtomic } from './paths';
+import { dataFile, cachedJsonStore } from './paths';
 import type { GuildEntry, GuildModeration, ResolvedModConfig, EnvModDefaults } from './settings-types';
 import { CROSS_POST_WINDOW } from './security';
 
@@ -25,8 +25,41 @@ interface Store {
   guilds: Record<string, GuildEntry>;
 }
 
-function load(): Store {
-  const file = filePath();
+// Each guild's merged toggles and resolved moderation config for the current version of
+// the store; both start empty whenever the store is re-read or saved. Read them only
+// after load(), which is what resets them.
+let toggleMemo = new Map<string, Readonly<Record<string, boolean>>>();
+let moderationMemo = new Map<string, { env: EnvModDefaults; resolved: ResolvedModConfig }>();
+
+// Every message hits this (metadata + security toggles, moderation config), so the
+// parsed store is cached. The path is resolved per read, so a changed GUILD_SETTINGS_PATH
+// takes effect on the next call.
+const { load, save } = cachedJsonStore(filePath, readStore, {
+  serialize: (store) => ({
+    _comment: 'Per-server configuration. _defaults applies to all guilds; per-guild entries override.',
+    _defaults: store._defaults,
+    guilds: store.guilds,
+  }),
+  onReload: () => {
+    toggleMemo = new Map();
+    moderationMemo = new Map();
+  },
+});
+
+// Merged toggles for one guild, built once per store version. getGuildSetting and
+// getAllGuildSettings both read through this, so the per-message feature checks are a
+// stat() and a single lookup.
+function mergedToggles(guildId: string): Readonly<Record<string, boolean>> {
+  const store = load();
+  let merged = toggleMemo.get(guildId);
+  if (!merged) {
+    merged = { ...DEFAULTS, ...store._defaults, ...(store.guilds[guildId]?.toggles ?? {}) };
+    toggleMemo.set(guildId, merged);
+  }
+  return merged;
+}
+
+function readStore(file: string): Store {
   if (!fs.existsSync(file)) return { _defaults: { ...DEFAULTS }, guilds: {} };
   try {
     const raw = JSON.parse(fs.readFileSync(file, 'utf8')) as Record<string, unknown>;
@@ -50,37 +83,31 @@ function load(): Store {
   }
 }
 
-function save(store: Store): void {
-  const out = {
-    _comment: 'Per-server configuration. _defaults applies to all guilds; per-guild entries override.',
-    _defaults: store._defaults,
-    guilds: store.guilds,
-  };
-  writeJsonAtomic(filePath(), out);
-}
-
 function entry(store: Store, guildId: string): GuildEntry {
   if (!store.guilds[guildId]) store.guilds[guildId] = { toggles: {}, moderation: {} };
   return store.guilds[guildId];
 }
 
 export function getGuildSetting(guildId: string, setting: string, fallback = false): boolean {
-  const store = load();
-  const g = store.guilds[guildId];
-  if (g && setting in g.toggles) return g.toggles[setting];
-  if (setting in store._defaults) return store._defaults[setting];
-  return fallback;
+  const merged = mergedToggles(guildId);
+  return setting in merged ? merged[setting] : fallback;
 }
 
 export function setGuildSetting(guildId: string, setting: string, value: boolean): void {
+  setGuildSettings(guildId, { [setting]: value });
+}
+
+// Several toggles in one write. Each save rewrites the whole file, so a panel change
+// that flips a tier of features should cost one write, not one per feature — and lands
+// atomically rather than as a run of partial updates.
+export function setGuildSettings(guildId: string, values: Record<string, boolean>): void {
   const store = load();
-  entry(store, guildId).toggles[setting] = value;
+  Object.assign(entry(store, guildId).toggles, values);
   save(store);
 }
 
 export function getAllGuildSettings(guildId: string): Record<string, boolean> {
-  const store = load();
-  return { ...DEFAULTS, ...store._defaults, ...(store.guilds[guildId]?.toggles ?? {}) };
+  return { ...mergedToggles(guildId) }; // copy: callers may edit it (settings panel)
 }
 
 export function getGuildModeration(guildId: string): Partial<GuildModeration> {
@@ -93,8 +120,13 @@ export function setModerationField<K extends keyof GuildModeration>(
   field: K,
   value: GuildModeration[K],
 ): void {
+  setModerationFields(guildId, { [field]: value } as Partial<GuildModeration>);
+}
+
+// Batched form of setModerationField: one write for a command that sets several fields.
+export function setModerationFields(guildId: string, fields: Partial<GuildModeration>): void {
   const store = load();
-  entry(store, guildId).moderation[field] = value;
+  Object.assign(entry(store, guildId).moderation, fields);
   save(store);
 }
 
@@ -141,6 +173,15 @@ export function resolveModeration(
   };
 }
 
+// Resolved per guild once per store version instead of on every message: resolving
+// builds five Sets from the stored arrays. Callers treat the result as read-only (the
+// /security command copies the sets before editing). Keyed on the env object too, so a
+// different baseline never gets another's result.
 export function getModeration(guildId: string, env: EnvModDefaults): ResolvedModConfig {
-  return resolveModeration(getGuildModeration(guildId), env);
+  const store = load();
+  const hit = moderationMemo.get(guildId);
+  if (hit && hit.env === env) return hit.resolved;
+  const resolved = resolveModeration(store.guilds[guildId]?.moderation, env);
+  moderationMemo.set(guildId, { env, resolved });
+  return resolved;
 }
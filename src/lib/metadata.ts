@@ -1,13 +1,18 @@
 ﻿// @ts-expect-error — exif-parser has no type declarations
 import exifParser from 'exif-parser';
 import iconv from 'iconv-lite';
+import { promisify } from 'util';
 import zlib from 'zlib';
 import { coercePromptValue } from './metadata/comfyui/graph-trace';
 import { runDetectors } from './metadata/registry';
 import { getChunk } from './metadata/types';
 
+// Async inflate runs on the libuv threadpool, so a large compressed ComfyUI workflow
+// doesn't stall the gateway heartbeat and other events while it decompresses.
+const inflate = promisify(zlib.inflate);
+
 // PNG chunk parser for AI generation parameters
-function parsePNGChunks(buffer: Buffer): Record<string, any> {
+async function parsePNGChunks(buffer: Buffer): Promise<Record<string, any>> {
   const chunks: Record<string, any> = {};
 
   // Check PNG signature
@@ -50,7 +55,7 @@ function parsePNGChunks(buffer: Buffer): Record<string, any> {
         textStart++;
         if (compressionFlag === 1 && compressionMethod === 0) {
           try {
-            const decompressed = zlib.inflateSync(data.slice(textStart));
+            const decompressed = await inflate(data.slice(textStart));
             chunks[key] = decompressed.toString('utf8');
           } catch { /* skip invalid compressed data */ }
         } else {
@@ -62,7 +67,7 @@ function parsePNGChunks(buffer: Buffer): Record<string, any> {
       if (nullIndex !== -1 && data[nullIndex + 1] === 0) {
         const key = data.toString('latin1', 0, nullIndex);
         try {
-          const decompressed = zlib.inflateSync(data.slice(nullIndex + 2));
+          const decompressed = await inflate(data.slice(nullIndex + 2));
           chunks[key] = decompressed.toString('utf8');
         } catch { /* skip invalid compressed data */ }
       }
@@ -594,6 +599,10 @@ function extractImageDimensions(buffer: Buffer, mimeType: string): { width: numb
     while (offset + 3 < buffer.length) {
       if (buffer[offset] !== 0xFF) break;
       const marker = buffer[offset + 1];
+      // Start of scan: entropy-coded data follows and the frame header (SOF) always
+      // precedes it, so there are no dimensions past this point — stop rather than
+      // hopping through image data on a bogus segment length.
+      if (marker === 0xDA) break;
       const segLen = buffer.readUInt16BE(offset + 2);
       // SOF0-SOF3, SOF5-SOF7, SOF9-SOF11, SOF13-SOF15 carry dimensions.
       // Exclude 0xC4 (DHT), 0xC8 (reserved), 0xCC (DAC).
@@ -612,32 +621,33 @@ function extractImageDimensions(buffer: Buffer, mimeType: string): { width: numb
   return null;
 }
 
+// Four-byte container tags compared as big-endian integers, so the checks below don't
+// decode a throwaway string per probe.
+const RIFF_TAG = 0x52494646; // 'RIFF'
+const WEBP_TAG = 0x57454250; // 'WEBP'
+
+function isWebPContainer(buffer: Buffer): boolean {
+  return buffer.length >= 12 && buffer.readUInt32BE(0) === RIFF_TAG && buffer.readUInt32BE(8) === WEBP_TAG;
+}
+
 function detectMimeFromMagic(buffer: Buffer): string | null {
   if (buffer.length < 4) return null;
-  // PNG: 89 50 4E 47 0D 0A 1A 0A
-  if (buffer[0] === 0x89 && buffer[1] === 0x50 && buffer[2] === 0x4E && buffer[3] === 0x47) {
-    return 'image/png';
-  }
-  // JPEG: FF D8 FF
-  if (buffer[0] === 0xFF && buffer[1] === 0xD8 && buffer[2] === 0xFF) {
-    return 'image/jpeg';
-  }
-  // WebP: RIFF????WEBP
-  if (
-    buffer.length >= 12 &&
-    buffer.toString('ascii', 0, 4) === 'RIFF' &&
-    buffer.toString('ascii', 8, 12) === 'WEBP'
-  ) {
-    return 'image/webp';
+  // Dispatch on the first byte: each format needs at most one full compare.
+  switch (buffer[0]) {
+    case 0x89: // PNG: 89 50 4E 47 0D 0A 1A 0A
+      return buffer[1] === 0x50 && buffer[2] === 0x4E && buffer[3] === 0x47 ? 'image/png' : null;
+    case 0xFF: // JPEG: FF D8 FF
+      return buffer[1] === 0xD8 && buffer[2] === 0xFF ? 'image/jpeg' : null;
+    case 0x52: // WebP: RIFF????WEBP
+      return isWebPContainer(buffer) ? 'image/webp' : null;
+    default:
+      return null;
   }
-  return null;
 }
 
 // Parse RIFF/WebP container chunks to extract an EXIF chunk if present.
 function parseWebPExif(buffer: Buffer): string | null {
-  if (buffer.length < 12) return null;
-  if (buffer.toString('ascii', 0, 4) !== 'RIFF') return null;
-  if (buffer.toString('ascii', 8, 12) !== 'WEBP') return null;
+  if (!isWebPContainer(buffer)) return null;
 
   let offset = 12;
   while (offset + 8 <= buffer.length) {
@@ -668,25 +678,30 @@ export async function extractMetadataFromBuffer(
   lastModified: string,
 ): Promise<Record<string, any>> {
   // Trust file content over extension — CDNs can mislabel format in the filename.
-  const effectiveMime = detectMimeFromMagic(buffer) ?? mimeType;
+  const detectedMime = detectMimeFromMagic(buffer);
+  const effectiveMime = detectedMime ?? mimeType;
 
   let exifData = {};
   let iptcData = {};
 
-  // Try to parse EXIF data (only works for JPEG/TIFF)
-  try {
-    const parser = exifParser.create(buffer);
-    const result = parser.parse();
-    exifData = result.tags || {};
-    iptcData = result.iptc || {};
-  } catch (e) {
-    // EXIF parsing failed, that's ok for PNGs
+  // exif-parser only reads JPEG (it walks FF-prefixed JPEG segments from byte 2), so
+  // only hand it buffers whose magic bytes say JPEG. Anything else — PNG, WebP, GIF,
+  // HTML error pages — would just walk the buffer and throw.
+  if (detectedMime === 'image/jpeg') {
+    try {
+      const parser = exifParser.create(buffer);
+      const result = parser.parse();
+      exifData = result.tags || {};
+      iptcData = result.iptc || {};
+    } catch (e) {
+      // EXIF parsing failed, that's ok for non-JPEG input
+    }
   }
 
   // Parse PNG chunks for AI metadata
   let aiData: Record<string, any> = {};
   if (effectiveMime === 'image/png') {
-    const chunks = parsePNGChunks(buffer);
+    const chunks = await parsePNGChunks(buffer);
     aiData = await parseAIMetadata(chunks);
   } else if (effectiveMime === 'image/webp') {
     const webpComment = parseWebPExif(buffer);
@@ -3,10 +3,14 @@ import { type FormatDetector, getChunk } from '../types';
 /** Get the Comment/Description text that is NOT valid JSON (MJ stores plain text). */
 function midjourneyComment(chunks: Parameters<FormatDetector['detect']>[0]): string | null {
   const commentText = getChunk(chunks, 'Comment') ?? getChunk(chunks, 'Description');
-  if (!commentText) return null;
-  // The original only reaches the Midjourney branch when JSON.parse throws.
-  try { JSON.parse(commentText); return null; } catch { /* not JSON — MJ candidate */ }
-  return commentText.includes('Job ID:') ? commentText : null;
+  if (!commentText || !commentText.includes('Job ID:')) return null;
+  // The original only reaches the Midjourney branch when JSON.parse throws. Text that
+  // contains "Job ID:" can only be valid JSON as an object, array or string, so plain
+  // text (every real MJ comment) skips the parse-and-throw entirely.
+  if (/^\s*[{["]/.test(commentText)) {
+    try { JSON.parse(commentText); return null; } catch { /* not JSON — MJ candidate */ }
+  }
+  return commentText;
 }
 
 export const midjourneyDetector: FormatDetector = {
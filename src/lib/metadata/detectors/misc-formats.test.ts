@@ -2,6 +2,8 @@ import { describe, it, expect } from 'vitest';
 import { parametersJsonDetector } from './parameters-json';
 import { davantDetector } from './davant';
 import { splitPromptDetector } from './split-prompt';
+import { midjourneyDetector } from './midjourney';
+import { novelAiDetector } from './novelai';
 
 describe('parametersJsonDetector', () => {
   const chunks = { 'parameters-json': JSON.stringify({ PositivePrompt: 'a girl', NegativePrompt: 'bad', Steps: 28 }) };
@@ -35,3 +37,28 @@ describe('splitPromptDetector', () => {
     expect(ai!.negative_prompt).toBe('low resolution');
   });
 });
+
+describe('midjourneyDetector', () => {
+  it('detects a plain-text comment with a Job ID', async () => {
+    const chunks = { Description: 'a cat in space --ar 16:9 --v 6 Job ID: 1234abcd-5678' };
+    expect(midjourneyDetector.detect(chunks)).toBe(true);
+    const ai = await midjourneyDetector.parse(chunks);
+    expect(ai!.prompt).toBe('a cat in space');
+    expect(ai!.aspect_ratio).toBe('16:9');
+  });
+
+  it('rejects a JSON comment even if it mentions a Job ID', () => {
+    expect(midjourneyDetector.detect({ Comment: '{"note": "Job ID: 1234"}' })).toBe(false);
+    expect(midjourneyDetector.detect({ Comment: '"Job ID: 1234"' })).toBe(false);
+  });
+});
+
+describe('novelAiDetector', () => {
+  it('detects a JSON comment with uc', () => {
+    expect(novelAiDetector.detect({ Comment: JSON.stringify({ prompt: 'a fox', uc: 'blurry' }) })).toBe(true);
+  });
+
+  it('ignores a plain-text comment', () => {
+    expect(novelAiDetector.detect({ Comment: 'just a photo caption' })).toBe(false);
+  });
+});
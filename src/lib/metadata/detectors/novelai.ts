@@ -3,6 +3,9 @@ import { coercePromptValue } from '../comfyui/graph-trace';
 
 /** Parse the Comment/Description JSON; return null if not NovelAI-shaped JSON. */
 function tryNovelAiComment(commentText: string): Record<string, any> | null {
+  // Only a JSON object can carry NovelAI fields. Most comments are plain text, so skip
+  // the parse (and the throw) for those, as the swarmui/a1111 detectors do.
+  if (!commentText.trimStart().startsWith('{')) return null;
   try {
     const novelData = JSON.parse(commentText);
     const aiData: Record<string, any> = {};
@@ -2,7 +2,7 @@ import { describe, it, expect, afterEach } from 'vitest';
 import fs from 'fs';
 import os from 'os';
 import path from 'path';
-import { dataFile, writeJsonAtomic, repoFile } from './paths';
+import { dataFile, writeJsonAtomic, repoFile, fileStamp, cachedJsonStore } from './paths';
 
 describe('dataFile', () => {
   afterEach(() => { delete process.env.DATA_DIR; });
@@ -53,4 +53,58 @@ describe('writeJsonAtomic', () => {
     writeJsonAtomic(target, { v: 2 });
     expect(JSON.parse(fs.readFileSync(target, 'utf8'))).toEqual({ v: 2 });
   });
+
+  it('writes compact JSON when pretty is false', () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'pib-'));
+    const target = path.join(dir, 'c.json');
+    writeJsonAtomic(target, { a: [1, 2] }, { pretty: false });
+    expect(fs.readFileSync(target, 'utf8')).toBe('{"a":[1,2]}');
+  });
+});
+
+describe('fileStamp', () => {
+  let dir: string;
+  afterEach(() => { if (dir) fs.rmSync(dir, { recursive: true, force: true }); });
+
+  it('reports a missing file and changes once the file is written or rewritten', () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'pib-'));
+    const target = path.join(dir, 'z.json');
+    expect(fileStamp(target)).toBe('missing');
+    writeJsonAtomic(target, { v: 1 });
+    const first = fileStamp(target);
+    expect(first).not.toBe('missing');
+    expect(fileStamp(target)).toBe(first); // stable while unchanged
+    writeJsonAtomic(target, { v: 12 });
+    expect(fileStamp(target)).not.toBe(first);
+  });
+});
+
+describe('cachedJsonStore', () => {
+  let dir: string;
+  afterEach(() => { if (dir) fs.rmSync(dir, { recursive: true, force: true }); });
+
+  it('reuses the parsed object until the file changes, and writes through on save', () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'pib-'));
+    const target = path.join(dir, 's.json');
+    let reads = 0;
+    let reloads = 0;
+    const store = cachedJsonStore(target, (f) => {
+      reads++;
+      return fs.existsSync(f) ? JSON.parse(fs.readFileSync(f, 'utf8')) as { n: number } : { n: 0 };
+    }, { onReload: () => { reloads++; } });
+
+    const first = store.load();
+    expect(store.load()).toBe(first);
+    expect(reads).toBe(1);
+
+    first.n = 1;
+    store.save(first);
+    expect(store.load()).toBe(first); // no re-parse of what we just wrote
+    expect(reads).toBe(1);
+    expect(reloads).toBe(2);
+
+    writeJsonAtomic(target, { n: 22 }); // edited behind the cache's back
+    expect(store.load()).toEqual({ n: 22 });
+    expect(reads).toBe(2);
+  });
 });
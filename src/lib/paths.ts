@@ -26,12 +26,69 @@ export function repoFile(name: string): string {
   return path.resolve(process.cwd(), name);
 }
 
-// Atomically write `data` as pretty JSON to `target`: write to a temp file in the same
+// Atomically write `data` as JSON to `target`: write to a temp file in the same
 // directory, then rename it over the target. Rename is atomic within a filesystem, so a
 // crash mid-write leaves only the temp file behind — never a half-written `target` that
 // a load() would parse-fail on and silently treat as empty (wiping the registry/settings).
-export function writeJsonAtomic(target: string, data: unknown): void {
+// Pretty-printed by default for stores people read by hand; machine-managed stores pass
+// `pretty: false` to skip the indentation (roughly halves the bytes written and the
+// stringify time for list-heavy data).
+export function writeJsonAtomic(target: string, data: unknown, opts: { pretty?: boolean } = {}): void {
   const tmp = `${target}.${process.pid}.tmp`;
-  fs.writeFileSync(tmp, JSON.stringify(data, null, 2));
+  fs.writeFileSync(tmp, opts.pretty === false ? JSON.stringify(data) : JSON.stringify(data, null, 2));
   fs.renameSync(tmp, target);
 }
+
+// Change stamp for an mtime-gated in-memory cache of a JSON store: nanosecond mtime plus
+// size, or 'missing'. A float mtimeMs can round two quick writes to the same value, and
+// same-size rewrites (one ID swapped for another) would then look unchanged.
+export function fileStamp(file: string): string {
+  try {
+    const st = fs.statSync(file, { bigint: true });
+    return `${st.mtimeNs}:${st.size}`;
+  } catch {
+    return 'missing';
+  }
+}
+
+// In-memory cache for a JSON store on a hot path (guild settings, schedules, ban
+// registry). load() re-reads only when the file's stamp or the resolved path changes, so
+// hand edits still take effect on the next read for the price of one stat(). Callers
+// mutate the object load() returns and then save() it, which writes through: the saved
+// object stays cached with no re-parse. If the write fails the cache is dropped, since
+// those in-place mutations never reached disk. `onReload` runs whenever the cached object
+// is replaced or re-saved, so stores that memoize views of it can reset them.
+export interface JsonStore<T> {
+  load(): T;
+  save(data: T): void;
+}
+
+export function cachedJsonStore<T>(
+  file: string | (() => string),
+  read: (file: string) => T,
+  opts: { pretty?: boolean; serialize?: (data: T) => unknown; onReload?: () => void } = {},
+): JsonStore<T> {
+  const resolve = typeof file === 'string' ? () => file : file;
+  let cached: { file: string; stamp: string; data: T } | null = null;
+  return {
+    load() {
+      const target = resolve();
+      const stamp = fileStamp(target);
+      if (cached && cached.file === target && cached.stamp === stamp) return cached.data;
+      cached = { file: target, stamp, data: read(target) };
+      opts.onReload?.();
+      return cached.data;
+    },
+    save(data) {
+      const target = resolve();
+      try {
+        writeJsonAtomic(target, opts.serialize ? opts.serialize(data) : data, { pretty: opts.pretty });
+      } catch (err) {
+        cached = null;
+        throw err;
+      }
+      cached = { file: target, stamp: fileStamp(target), data };
+      opts.onReload?.();
+    },
+  };
+}
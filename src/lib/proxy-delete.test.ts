@@ -0,0 +1,41 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { ProxyDeleteWatcher } from './proxy-delete';
+
+describe('ProxyDeleteWatcher', () => {
+  afterEach(() => { vi.useRealTimers(); });
+
+  it('reports a delete that lands before the wait starts', async () => {
+    const w = new ProxyDeleteWatcher(10);
+    w.noteDeleted('m1');
+    expect(await w.waitForDelete('m1', 500)).toBe(true);
+  });
+
+  it('resolves early when the message is deleted during the wait', async () => {
+    vi.useFakeTimers();
+    const w = new ProxyDeleteWatcher(10);
+    const p = w.waitForDelete('m1', 500);
+    w.noteDeleted('m1');
+    expect(await p).toBe(true);
+  });
+
+  it('resolves false when the message survives the window', async () => {
+    vi.useFakeTimers();
+    const w = new ProxyDeleteWatcher(10);
+    w.noteDeleted('other');
+    const p = w.waitForDelete('m1', 500);
+    vi.advanceTimersByTime(500);
+    expect(await p).toBe(false);
+  });
+
+  it('forgets the oldest unclaimed deletes past the cap', async () => {
+    vi.useFakeTimers();
+    const w = new ProxyDeleteWatcher(2);
+    w.noteDeleted('a');
+    w.noteDeleted('b');
+    w.noteDeleted('c');
+    const p = w.waitForDelete('a', 500);
+    vi.advanceTimersByTime(500);
+    expect(await p).toBe(false);
+    expect(await w.waitForDelete('c', 500)).toBe(true);
+  });
+});
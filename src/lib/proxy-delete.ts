@@ -0,0 +1,45 @@
+// PluralKit proxies by deleting the original and reposting via webhook. The message
+// handler waits out a short window to see whether a message gets deleted; the
+// MessageDelete listener reports every delete here and resolves those waits early, so a
+// proxied original is dropped the moment it's deleted and surviving messages need no
+// REST fetch to confirm they still exist.
+//
+// The wait only starts after the security pass, which can spend seconds downloading
+// attachments, so a prompt proxy delete often lands first. Deletes nobody was waiting
+// for are remembered (bounded, oldest evicted first) so a later wait still sees them.
+export class ProxyDeleteWatcher {
+  private readonly waiting = new Map<string, () => void>();
+  private readonly recent = new Set<string>();
+
+  constructor(private readonly maxRecent: number) {}
+
+  noteDeleted(messageId: string): void {
+    const resolve = this.waiting.get(messageId);
+    if (resolve) {
+      resolve();
+      return;
+    }
+    this.recent.add(messageId);
+    while (this.recent.size > this.maxRecent) {
+      const oldest = this.recent.values().next().value;
+      if (oldest === undefined) break;
+      this.recent.delete(oldest);
+    }
+  }
+
+  // Resolves true if the message was deleted already or within `ms`, false if it survived.
+  waitForDelete(messageId: string, ms: number): Promise<boolean> {
+    if (this.recent.delete(messageId)) return Promise.resolve(true);
+    return new Promise(resolve => {
+      const timer = setTimeout(() => {
+        this.waiting.delete(messageId);
+        resolve(false);
+      }, ms);
+      this.waiting.set(messageId, () => {
+        clearTimeout(timer);
+        this.waiting.delete(messageId);
+        resolve(true);
+      });
+    });
+  }
+}
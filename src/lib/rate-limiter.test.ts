@@ -0,0 +1,62 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { RateLimiter, SlidingWindowLimiter } from './rate-limiter';
+
+describe('SlidingWindowLimiter', () => {
+  afterEach(() => { vi.useRealTimers(); });
+
+  it('allows up to the limit within one window, then blocks', () => {
+    vi.useFakeTimers();
+    vi.setSystemTime(0);
+    const rl = new SlidingWindowLimiter(5, 30);
+    for (let i = 0; i < 5; i++) expect(rl.isRateLimited('u')).toBe(false);
+    expect(rl.isRateLimited('u')).toBe(true);
+    expect(rl.isRateLimited('other')).toBe(false); // per-user
+  });
+
+  it('does not allow a full fresh burst right after a window boundary', () => {
+    vi.useFakeTimers();
+    vi.setSystemTime(29_000);
+    const rl = new SlidingWindowLimiter(5, 30);
+    for (let i = 0; i < 5; i++) rl.isRateLimited('u');
+    // A fixed window would reset here and allow 5 more (10 in ~2s).
+    vi.setSystemTime(60_000);
+    expect(rl.isRateLimited('u')).toBe(true);
+  });
+
+  it('frees capacity as the previous window slides out', () => {
+    vi.useFakeTimers();
+    vi.setSystemTime(0);
+    const rl = new SlidingWindowLimiter(5, 30);
+    for (let i = 0; i < 5; i++) rl.isRateLimited('u');
+    vi.setSystemTime(45_000); // halfway through the next window: 5 * 0.5 = 2.5 carried over
+    expect(rl.isRateLimited('u')).toBe(false);
+    expect(rl.isRateLimited('u')).toBe(false);
+    expect(rl.isRateLimited('u')).toBe(true);
+  });
+
+  it('forgets history after two idle windows', () => {
+    vi.useFakeTimers();
+    vi.setSystemTime(0);
+    const rl = new SlidingWindowLimiter(5, 30);
+    for (let i = 0; i < 5; i++) rl.isRateLimited('u');
+    vi.setSystemTime(61_000);
+    for (let i = 0; i < 5; i++) expect(rl.isRateLimited('u')).toBe(false);
+  });
+});
+
+describe('RateLimiter', () => {
+  afterEach(() => { vi.useRealTimers(); });
+
+  it('blocks at the limit and frees slots as old requests expire', () => {
+    vi.useFakeTimers();
+    vi.setSystemTime(0);
+    const rl = new RateLimiter(2, 10);
+    expect(rl.isRateLimited('u')).toBe(false);
+    vi.setSystemTime(5_000);
+    expect(rl.isRateLimited('u')).toBe(false);
+    expect(rl.isRateLimited('u')).toBe(true);
+    vi.setSystemTime(10_000); // first request has aged out, second hasn't
+    expect(rl.isRateLimited('u')).toBe(false);
+    expect(rl.isRateLimited('u')).toBe(true);
+  });
+});
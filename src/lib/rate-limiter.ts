@@ -1,22 +1,99 @@
+// Both limiters keep one entry per user seen. Entries are only trimmed when that user
+// comes back, so once per window each limiter drops users with nothing left in it —
+// otherwise the maps grow by every user who ever ran a command over the bot's uptime.
+
 export class RateLimiter {
   private requests = new Map<string, number[]>();
+  private lastSweep = 0;
 
   constructor(
     private maxRequests: number = 5,
     private windowSeconds: number = 30,
   ) {}
 
+  private sweepIdle(now: number): void {
+    if (now - this.lastSweep < this.windowSeconds) return;
+    this.lastSweep = now;
+    for (const [uid, times] of this.requests) {
+      const newest = times[times.length - 1];
+      if (newest === undefined || now - newest >= this.windowSeconds) this.requests.delete(uid);
+    }
+  }
+
   isRateLimited(userId: string): boolean {
     const now = Date.now() / 1000;
-    const times = (this.requests.get(userId) ?? []).filter(t => now - t < this.windowSeconds);
-
-    if (times.length >= this.maxRequests) {
+    this.sweepIdle(now);
+    let times = this.requests.get(userId);
+    if (!times) {
+      times = [];
       this.requests.set(userId, times);
-      return true;
     }
 
+    // Timestamps are appended in order, so the expired ones are a prefix: shift the live
+    // tail down over it in place (splice would allocate an array of the removed ones).
+    // What's left is exactly the in-window count, so one scan of the expired prefix is
+    // the whole check — no array built, no second pass to count.
+    let expired = 0;
+    while (expired < times.length && now - times[expired] >= this.windowSeconds) expired++;
+    if (expired) {
+      times.copyWithin(0, expired);
+      times.length -= expired;
+    }
+
+    if (times.length >= this.maxRequests) return true;
+
     times.push(now);
-    this.requests.set(userId, times);
+    return false;
+  }
+}
+
+// Sliding-window counter: keeps only the current and previous fixed-window counts per
+// user and weights the previous one by how much of it still overlaps the sliding
+// window. O(1) state and work per check (no timestamp list to filter), and unlike a
+// plain fixed window it can't be burst to ~2x the limit across a window boundary.
+interface WindowCounter { start: number; curr: number; prev: number; }
+
+export class SlidingWindowLimiter {
+  private counters = new Map<string, WindowCounter>();
+  private lastSweep = 0;
+
+  constructor(
+    private maxRequests: number = 5,
+    private windowSeconds: number = 30,
+  ) {}
+
+  // A counter whose window started two or more windows ago carries nothing over
+  // (isRateLimited would zero both counts), so it's safe to forget.
+  private sweepIdle(now: number): void {
+    if (now - this.lastSweep < this.windowSeconds) return;
+    this.lastSweep = now;
+    for (const [uid, c] of this.counters) {
+      if (now - c.start >= 2 * this.windowSeconds) this.counters.delete(uid);
+    }
+  }
+
+  isRateLimited(userId: string): boolean {
+    const now = Date.now() / 1000;
+    this.sweepIdle(now);
+    const w = this.windowSeconds;
+    let c = this.counters.get(userId);
+    if (!c) {
+      c = { start: now, curr: 0, prev: 0 };
+      this.counters.set(userId, c);
+    }
+
+    const elapsedWindows = Math.floor((now - c.start) / w);
+    if (elapsedWindows >= 1) {
+      // One window later the current count becomes the previous; any longer and both are stale.
+      c.prev = elapsedWindows === 1 ? c.curr : 0;
+      c.curr = 0;
+      c.start += elapsedWindows * w;
+    }
+
+    const weight = 1 - (now - c.start) / w;
+    if (c.prev * weight + c.curr + 1 > this.maxRequests) return true;
+
+    c.curr++;
     return false;
   }
 }
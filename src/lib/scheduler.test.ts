@@ -1,6 +1,6 @@
 import { describe, it, expect } from 'vitest';
 import fs from 'fs';
-import { qotdQuestionsPath, loadSeedQuestions } from './scheduler';
+import { qotdQuestionsPath, loadSeedQuestions, unusedQotdQuestions } from './scheduler';
 
 // Regression guard for the `/qotd import` bug: the path was resolved from __dirname
 // (-> src/ or dist/, where the seed file isn't), so it never found the bank committed
@@ -18,3 +18,13 @@ describe('loadSeedQuestions', () => {
     expect(qs.every(q => typeof q === 'string')).toBe(true);
   });
 });
+
+describe('unusedQotdQuestions', () => {
+  it('returns the questions not yet used, in pool order', () => {
+    expect(unusedQotdQuestions({ questions: ['a', 'b', 'c', 'd'], usedQuestions: ['c', 'a'] })).toEqual(['b', 'd']);
+  });
+
+  it('ignores used entries that are no longer in the pool', () => {
+    expect(unusedQotdQuestions({ questions: ['a'], usedQuestions: ['gone'] })).toEqual(['a']);
+  });
+});
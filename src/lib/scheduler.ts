@@ -1,6 +1,6 @@
 import fs from 'fs';
 import { Client, TextChannel } from 'discord.js';
-import { dataFile, writeJsonAtomic, repoFile } from './paths';
+import { dataFile, cachedJsonStore, repoFile } from './paths';
 
 const FILE = dataFile('schedules.json');
 
@@ -32,16 +32,17 @@ interface Schedules {
 
 // ── Persistence ───────────────────────────────────────────────────────────────
 
-function load(): Schedules {
+// The minute tick and every /qotd or /reminder call load this, and it holds whole
+// question banks, so it's cached rather than re-parsed each time. Machine-managed
+// (question banks, reminder timestamps) and rewritten by the tick, so written compact.
+const { load, save } = cachedJsonStore(FILE, readSchedules, { pretty: false });
+
+function readSchedules(): Schedules {
   if (!fs.existsSync(FILE)) return { qotd: {}, reminders: [] };
   try { return JSON.parse(fs.readFileSync(FILE, 'utf8')); }
   catch { return { qotd: {}, reminders: [] }; }
 }
 
-function save(data: Schedules): void {
-  writeJsonAtomic(FILE, data);
-}
-
 // ── Public API ────────────────────────────────────────────────────────────────
 
 export function getQotdConfig(guildId: string): QotdConfig | null {
@@ -64,6 +65,33 @@ export function addQotdQuestion(guildId: string, question: string): boolean {
   return true;
 }
 
+// Bulk add for /qotd import: dedupes through one Set and saves once. Adding a seed bank
+// question-by-question was an includes() scan plus a full file rewrite per question.
+// Returns how many were new.
+export function addQotdQuestions(guildId: string, questions: string[]): number {
+  const data = load();
+  const cfg = data.qotd[guildId];
+  if (!cfg) return 0;
+  const known = new Set(cfg.questions);
+  let added = 0;
+  for (const q of questions) {
+    if (known.has(q)) continue;
+    known.add(q);
+    cfg.questions.push(q);
+    added++;
+  }
+  if (added) save(data);
+  return added;
+}
+
+// Questions not yet posted this cycle. Membership goes through a Set built once, so
+// this is O(questions + used) rather than an includes() scan per question — imported
+// seed banks run to hundreds of entries on both sides.
+export function unusedQotdQuestions(cfg: Pick<QotdConfig, 'questions' | 'usedQuestions'>): string[] {
+  const used = new Set(cfg.usedQuestions);
+  return cfg.questions.filter(q => !used.has(q));
+}
+
 // Path to the bundled seed question bank, committed at the repo root.
 export function qotdQuestionsPath(): string {
   return repoFile('qotd-questions.json');
@@ -153,7 +181,7 @@ async function tick(client: Client): Promise<void> {
     if (now - cfg.lastPosted < cfg.intervalMs) continue;
     if (!cfg.questions.length) continue;
 
-    const unused = cfg.questions.filter(q => !cfg.usedQuestions.includes(q));
+    const unused = unusedQotdQuestions(cfg);
     const pool = unused.length ? unused : cfg.questions;
     if (unused.length === 0) cfg.usedQuestions = [];
 
@@ -188,7 +216,8 @@ async function tick(client: Client): Promise<void> {
   }
 
   if (toRemove.length) {
-    data.reminders = data.reminders.filter(r => !toRemove.includes(r.id));
+    const removed = new Set(toRemove);
+    data.reminders = data.reminders.filter(r => !removed.has(r.id));
   }
 
   if (dirty) save(data);
@@ -2,7 +2,7 @@ import { describe, it, expect, vi } from 'vitest';
 import {
   isTrusted, calculateScamScore, algoSpeakScore, detectDisguisedExecutable,
   isGifLink, isMediaMessage, hasHoneypotRole, trackMessage, checkMediaVelocity,
-  isRecentJoin, mediaRaidThreshold,
+  isRecentJoin, mediaRaidThreshold, readHeader, checkCrossPosting, isGibberish, SCAM_BAN_SCORE,
 } from './security';
 import type { ResolvedModConfig } from './settings-types';
 
@@ -89,6 +89,35 @@ describe('calculateScamScore', () => {
     expect(reasons.some(r => /CATCHER/i.test(r))).toBe(true);
     expect(score).toBeGreaterThanOrEqual(30);
   });
+
+  it('scores every overlapping keyword, not just the first match', () => {
+    const [, reasons] = calculateScamScore(fakeMessage({ content: 'buy my empty wallet' }), cfg());
+    const keywords = reasons.filter(r => r.startsWith('Keyword match'));
+    expect(keywords).toHaveLength(3); // WALLET, EMPTY WALLET, BUY…WALLET
+  });
+
+  it('flags caps spam, counting only A–Z', () => {
+    const [, shouty] = calculateScamScore(fakeMessage({ content: 'THIS IS A VERY LOUD MESSAGE' }), cfg());
+    expect(shouty.some(r => r.startsWith('Caps spam'))).toBe(true);
+    const [, mixed] = calculateScamScore(fakeMessage({ content: 'ÉÉÉÉÉÉÉÉÉÉ some lowercase words' }), cfg());
+    expect(mixed.some(r => r.startsWith('Caps spam'))).toBe(false);
+  });
+
+  it('adds no keyword score for ordinary text', () => {
+    const [, reasons] = calculateScamScore(fakeMessage({ content: 'lovely lighting on this one' }), cfg());
+    expect(reasons.some(r => r.startsWith('Keyword match'))).toBe(false);
+  });
+
+  it('skips the keyword scan once account signals alone reach the ban score', () => {
+    const m = fakeMessage({
+      content: 'CLAIM YOUR FREE WALLET NOW',
+      author: { id: 'u1', username: '$john.smith99_12345', avatar: null },
+      member: { displayName: '$john.smith99_12345', roles: { cache: new Map([['g1', {}], ['catch', {}]]) } },
+    });
+    const [score, reasons] = calculateScamScore(m, cfg({ catcherRoleId: 'catch' }));
+    expect(score).toBeGreaterThanOrEqual(SCAM_BAN_SCORE);
+    expect(reasons.some(r => r.startsWith('Keyword match'))).toBe(false);
+  });
 });
 
 describe('pure scorers still work', () => {
@@ -117,6 +146,27 @@ describe('detectDisguisedExecutable', () => {
   });
 });
 
+describe('readHeader', () => {
+  it('returns only the leading bytes and stops pulling the body', async () => {
+    let pulls = 0;
+    const body = new ReadableStream<Uint8Array>({
+      pull(controller) {
+        pulls++;
+        controller.enqueue(new Uint8Array(1024).fill(pulls));
+      },
+    });
+    const head = await readHeader(new Response(body), 2000);
+    expect(head.length).toBe(2000);
+    expect(head[0]).toBe(1);
+    expect(pulls).toBeLessThan(5);
+  });
+
+  it('handles a body shorter than the limit', async () => {
+    const head = await readHeader(new Response(Buffer.from([0x4d, 0x5a])));
+    expect(detectDisguisedExecutable(head)).not.toBeNull();
+  });
+});
+
 function mediaMsg(over: any = {}): any {
   return { author: { id: 'v1' }, content: '', channelId: 'c1', attachments: new Map(), ...over };
 }
@@ -223,6 +273,46 @@ describe('checkMediaVelocity', () => {
   });
 });
 
+describe('checkCrossPosting', () => {
+  it('matches identical short and long messages across channels', () => {
+    const long = 'free nitro giveaway '.repeat(10); // past the raw-key length, so digested
+    for (const [uid, text] of [['xp-short', 'hi all'], ['xp-long', long]]) {
+      const mk = (ch: string) => mediaMsg({ author: { id: uid }, channelId: ch, content: text });
+      trackMessage(mk('a'));
+      const cur = mk('b');
+      trackMessage(cur);
+      expect(checkCrossPosting(cur)).toBe(2);
+    }
+  });
+
+  it('does not match long messages that differ only at the end', () => {
+    const base = 'x'.repeat(200);
+    trackMessage(mediaMsg({ author: { id: 'xp-diff' }, channelId: 'a', content: `${base}1` }));
+    const cur = mediaMsg({ author: { id: 'xp-diff' }, channelId: 'b', content: `${base}2` });
+    trackMessage(cur);
+    expect(checkCrossPosting(cur)).toBe(1);
+  });
+});
+
+describe('isGibberish', () => {
+  it('never flags two-character laughter or key-mashing from members with roles', () => {
+    expect(isGibberish('HaHa hAhA', true, false)).toBe(false);
+    expect(isGibberish('aaaaaaa', true, false)).toBe(false);
+  });
+  it('flags a random single word from a user with no roles', () => {
+    expect(isGibberish('xkqzvplm', false, false)).toBe(true);
+  });
+  it('lets common words through', () => {
+    expect(isGibberish('thanks', false, false)).toBe(false);
+  });
+  it('only considers single words of 5–20 letters', () => {
+    expect(isGibberish('xkqz', false, false)).toBe(false);
+    expect(isGibberish('x'.repeat(21), false, false)).toBe(false);
+    expect(isGibberish('xkqzv plmqw', false, false)).toBe(false);
+    expect(isGibberish('xkqzv1', false, false)).toBe(false);
+  });
+});
+
 describe('isRecentJoin', () => {
   const now = 1_000_000_000_000;
   const day = 24 * 60 * 60 * 1000;
@@ -8,13 +8,41 @@ import { BLOCKED_IMAGE_DOMAINS } from './config';
 // ── Cross-post tracking ───────────────────────────────────────────────────────
 
 interface TrackedMessage { fingerprint: string; channelId: string; timestamp: number; isMedia: boolean; }
-const userMessages = new Map<string, TrackedMessage[]>();
+// Per-user history, oldest first, plus an index of fingerprint → channel → entry count
+// kept in step with it, so a cross-post check is one lookup instead of a rescan.
+interface UserHistory { entries: TrackedMessage[]; channelsByFp: Map<string, Map<string, number>>; }
+const userMessages = new Map<string, UserHistory>();
 export const CROSS_POST_WINDOW = 300; // seconds; also the max retention, so velocity windows are clamped to it
+const MAX_TRACKED_PER_USER = 50;
+
+// Above this length the key is stored as a digest, so long messages don't keep up to
+// 50 × 4 KB of text per user alive for the whole window. Shorter keys — the vast
+// majority, and every bare-attachment repost — are used as-is: exact, and no hashing.
+const FINGERPRINT_RAW_MAX = 64;
+
+// trackMessage, checkCrossPosting and checkMediaVelocity all key on the same message's
+// fingerprint, so it's computed once per Message object and remembered weakly (gone when
+// discord.js drops the message). Only MessageCreate feeds these, so the content a
+// fingerprint was taken from doesn't change underneath it.
+const fingerprints = new WeakMap<Message, string>();
 
 function fingerprint(message: Message): string {
+  let fp = fingerprints.get(message);
+  if (fp === undefined) {
+    fp = computeFingerprint(message);
+    fingerprints.set(message, fp);
+  }
+  return fp;
+}
+
+function computeFingerprint(message: Message): string {
   let s = message.content.trim();
   for (const a of message.attachments.values()) s += `|${a.name}|${a.size}`;
-  return crypto.createHash('md5').update(s).digest('hex');
+  // Prefixes keep the two key spaces disjoint: raw text can never equal a digest key.
+  if (s.length <= FINGERPRINT_RAW_MAX) return `r:${s}`;
+  // Identity only, not security: MD5 through the one-shot crypto.hash (no Hash object
+  // per call), as 24-char base64 rather than 32-char hex.
+  return `h:${crypto.hash('md5', s, 'base64')}`;
 }
 
 // ── Media detection ───────────────────────────────────────────────────────────
@@ -50,22 +78,55 @@ export function isMediaMessage(message: Message, gifDomains: string[]): boolean
   return isGifLink(message.content ?? '', gifDomains);
 }
 
+function dropOldest(h: UserHistory): void {
+  const old = h.entries.shift()!;
+  const channels = h.channelsByFp.get(old.fingerprint)!;
+  const n = channels.get(old.channelId)! - 1;
+  if (n > 0) channels.set(old.channelId, n);
+  else channels.delete(old.channelId);
+  if (channels.size === 0) h.channelsByFp.delete(old.fingerprint);
+}
+
+// Users are only trimmed when they post again, so anyone who posted once would keep a
+// (stale) entry forever. Once per window, drop users whose newest entry has expired —
+// O(users) every five minutes instead of unbounded growth over the bot's uptime.
+let lastSweep = 0;
+
+function sweepIdleUsers(now: number): void {
+  if (now - lastSweep < CROSS_POST_WINDOW) return;
+  lastSweep = now;
+  for (const [uid, h] of userMessages) {
+    const newest = h.entries[h.entries.length - 1];
+    if (!newest || now - newest.timestamp >= CROSS_POST_WINDOW) userMessages.delete(uid);
+  }
+}
+
 export function trackMessage(message: Message, gifDomains: string[] = []): void {
   const uid = message.author.id;
   const now = Date.now() / 1000;
+  sweepIdleUsers(now);
   const fp = fingerprint(message);
   const isMedia = isMediaMessage(message, gifDomains);
-  const prev = (userMessages.get(uid) ?? []).filter(m => now - m.timestamp < CROSS_POST_WINDOW);
-  prev.push({ fingerprint: fp, channelId: message.channelId, timestamp: now, isMedia });
-  userMessages.set(uid, prev.slice(-50));
+  let h = userMessages.get(uid);
+  if (!h) {
+    h = { entries: [], channelsByFp: new Map() };
+    userMessages.set(uid, h);
+  }
+  // Entries are in arrival order, so expiry and the size cap both trim from the front.
+  while (h.entries.length && (now - h.entries[0].timestamp >= CROSS_POST_WINDOW || h.entries.length >= MAX_TRACKED_PER_USER)) {
+    dropOldest(h);
+  }
+  h.entries.push({ fingerprint: fp, channelId: message.channelId, timestamp: now, isMedia });
+  let channels = h.channelsByFp.get(fp);
+  if (!channels) {
+    channels = new Map();
+    h.channelsByFp.set(fp, channels);
+  }
+  channels.set(message.channelId, (channels.get(message.channelId) ?? 0) + 1);
 }
 
 export function checkCrossPosting(message: Message): number {
-  const uid = message.author.id;
-  const fp = fingerprint(message);
-  const recent = userMessages.get(uid) ?? [];
-  const channels = new Set(recent.filter(m => m.fingerprint === fp).map(m => m.channelId));
-  return channels.size;
+  return userMessages.get(message.author.id)?.channelsByFp.get(fingerprint(message))?.size ?? 0;
 }
 
 // Two-track velocity over the same in-memory tracking, read over a tighter
@@ -80,10 +141,18 @@ export function checkMediaVelocity(
   const uid = message.author.id;
   const now = Date.now() / 1000;
   const fp = fingerprint(message);
-  const recent = (userMessages.get(uid) ?? []).filter(m => now - m.timestamp < windowSec);
-  const sameChannels = new Set(recent.filter(m => m.fingerprint === fp).map(m => m.channelId)).size;
-  const mediaChannels = new Set(recent.filter(m => m.isMedia).map(m => m.channelId)).size;
-  return { sameChannels, mediaChannels };
+  const entries = userMessages.get(uid)?.entries ?? [];
+  // Entries are oldest-first, so walk back from the newest and stop at the window edge:
+  // one pass, no intermediate arrays.
+  const same = new Set<string>();
+  const media = new Set<string>();
+  for (let i = entries.length - 1; i >= 0; i--) {
+    const m = entries[i];
+    if (now - m.timestamp >= windowSec) break;
+    if (m.fingerprint === fp) same.add(m.channelId);
+    if (m.isMedia) media.add(m.channelId);
+  }
+  return { sameChannels: same.size, mediaChannels: media.size };
 }
 
 // New members rarely *upload* GIFs directly — legit GIFs arrive as Tenor/Giphy/Klipy
@@ -113,25 +182,48 @@ export function mediaRaidThreshold(
 
 // ── Gibberish / spam detection ────────────────────────────────────────────────
 
-const COMMON_OK = new Set([
+const COMMON_OK: ReadonlySet<string> = new Set([
   'hello','hi','thanks','thank','please','welcome','yes','no','okay','ok',
   'sure','nice','good','great','awesome','cool','wow','lol','lmao','rofl',
   'omg','wtf','brb','afk','gg','gn',
 ]);
 
+const WHITESPACE = /\s/;
+
+// One 5–20 letter word. The length bounds live in the pattern, so a long message fails
+// as soon as the quantifier does and there's no separate space check (letters-only
+// already excludes it).
+const SINGLE_WORD = /^[a-zA-Z]{5,20}$/;
+
+// "aaaa" / "hahaha"-style text: at most two distinct (case-folded, non-whitespace)
+// characters. Bails on the third distinct one instead of building a Set of the whole
+// message; printable ASCII skips the whitespace regex entirely.
+function hasAtMostTwoDistinctChars(text: string): boolean {
+  const lower = text.toLowerCase();
+  let a = -1;
+  let b = -1;
+  for (let i = 0; i < lower.length; i++) {
+    const c = lower.charCodeAt(i);
+    if ((c <= 0x20 || c >= 0x7f) && WHITESPACE.test(lower[i])) continue;
+    if (c === a || c === b) continue;
+    if (a === -1) a = c;
+    else if (b === -1) b = c;
+    else return false;
+  }
+  return true;
+}
+
 export function isGibberish(text: string, userHasRoles: boolean, hasImages: boolean): boolean {
   text = text.trim();
   if (!text) return !hasImages;
 
-  if (userHasRoles) {
-    const unique = new Set(text.replace(/\s/g, '').toLowerCase().split(''));
-    if (unique.size <= 2) return false;
-  }
+  if (userHasRoles && hasAtMostTwoDistinctChars(text)) return false;
 
-  if (/^[a-zA-Z]+$/.test(text) && !text.includes(' ') && text.length >= 5 && text.length <= 20) {
-    if (COMMON_OK.has(text.toLowerCase())) return false;
-    if (userHasRoles) return false;
-    return true;
+  if (SINGLE_WORD.test(text)) {
+    // Members with roles are never flagged for a single word, so only the no-role path
+    // lowercases for the common-word lookup — at most one toLowerCase per message,
+    // since hasAtMostTwoDistinctChars (which makes its own) only runs for role holders.
+    return !userHasRoles && !COMMON_OK.has(text.toLowerCase());
   }
 
   return false;
@@ -139,6 +231,9 @@ export function isGibberish(text: string, userHasRoles: boolean, hasImages: bool
 
 // ── Wallet scam scoring ───────────────────────────────────────────────────────
 
+// Score at which calculateScamScore's result means an instant ban.
+export const SCAM_BAN_SCORE = 100;
+
 const SCAM_PATTERNS: [RegExp, number][] = [
   [/\bWALL?LET\b/i, 50],
   [/\b\d+\s*SOL\b/i, 50],
@@ -151,36 +246,71 @@ const SCAM_PATTERNS: [RegExp, number][] = [
   [/\bBUY\b.*\bWALLET\b/i, 40],
 ];
 
+// One-pass gate over all keywords. Most messages match none, so this replaces nine
+// scans with one; the per-pattern loop only runs on a hit. Scoring still tests each
+// pattern separately — overlapping keywords (EMPTY WALLET / WALLET / BUY…WALLET)
+// each count, which a single finditer-style alternation would not preserve.
+const SCAM_ANY = new RegExp(SCAM_PATTERNS.map(([p]) => `(?:${p.source})`).join('|'), 'i');
+
+// A–Z count without materialising the string as an array of characters (the previous
+// spread+filter allocated one entry per character on every message over 20 chars).
+// A–Z are single UTF-16 units, so this matches the per-code-point count exactly.
+function countAsciiUpper(text: string): number {
+  let n = 0;
+  for (let i = 0; i < text.length; i++) {
+    const c = text.charCodeAt(i);
+    if (c >= 65 && c <= 90) n++;
+  }
+  return n;
+}
+
+// Username heuristics, hoisted so they're built once. AUTO_USERNAME matches
+// case-insensitively rather than against a lowercased copy of the name.
+const CURRENCY_IN_NAME = /[£€¥₿$₹₽]/;
+const HOIST_PREFIX = /^[!=@#._\-~]/;
+const AUTO_USERNAME = /[a-z]+\.[a-z]+\d{2,4}_\d{4,}/i;
+
 export function calculateScamScore(message: Message, cfg: ResolvedModConfig): [number, string[]] {
   let score = 0;
   const reasons: string[] = [];
-  const name = (message.member?.displayName ?? message.author.username);
+  // message.member is a getter that resolves through the guild member cache on every
+  // access — read it (and the other hot fields) once.
+  const member = message.member;
+  const { author, content } = message;
+  const name = (member?.displayName ?? author.username);
 
-  if (/[£€¥₿$₹₽]/.test(name)) { score += 20; reasons.push('Currency symbols in username'); }
-  if (name && /^[!=@#._\-~]/.test(name)) { score += 20; reasons.push('Hoisting character in username'); }
-  if (/[a-z]+\.[a-z]+\d{2,4}_\d{4,}/.test(name.toLowerCase())) { score += 15; reasons.push('Auto-generated username pattern'); }
+  if (CURRENCY_IN_NAME.test(name)) { score += 20; reasons.push('Currency symbols in username'); }
+  if (name && HOIST_PREFIX.test(name)) { score += 20; reasons.push('Hoisting character in username'); }
+  if (AUTO_USERNAME.test(name)) { score += 15; reasons.push('Auto-generated username pattern'); }
 
-  if (message.content.length > 20) {
-    const caps = [...message.content].filter(c => c >= 'A' && c <= 'Z').length;
-    const ratio = caps / message.content.length;
+  if (content.length > 20) {
+    const caps = countAsciiUpper(content);
+    const ratio = caps / content.length;
     if (ratio > 0.7) { score += 30; reasons.push(`Caps spam (${Math.round(ratio * 100)}%)`); }
   }
 
-  for (const [pattern, pts] of SCAM_PATTERNS) {
-    if (pattern.test(message.content)) { score += pts; reasons.push(`Keyword match: ${pattern.source}`); }
-  }
-
-  const member = message.member;
   if (member) {
     const roles = member.roles.cache;
-    if (cfg.catcherRoleId && roles.size === 2 && roles.has(cfg.catcherRoleId)) {
+    const roleCount = roles.size;
+    if (cfg.catcherRoleId && roleCount === 2 && roles.has(cfg.catcherRoleId)) {
       score += 30; reasons.push('Only has CATCHER role');
-    } else if (roles.size === 1) {
+    } else if (roleCount === 1) {
       score += 20; reasons.push('No roles (only @everyone)');
     }
   }
 
-  if (!message.author.avatar) { score += 15; reasons.push('No profile picture'); }
+  if (!author.avatar) { score += 15; reasons.push('No profile picture'); }
+
+  // The keyword scan is the only regex pass over the message body, so it runs last and
+  // is skipped once the cheap account/name signals alone reach the ban score — the
+  // outcome can't change. It isn't cut short mid-scan: overlapping keywords all count.
+  if (score >= SCAM_BAN_SCORE) return [score, reasons];
+
+  if (SCAM_ANY.test(content)) {
+    for (const [pattern, pts] of SCAM_PATTERNS) {
+      if (pattern.test(content)) { score += pts; reasons.push(`Keyword match: ${pattern.source}`); }
+    }
+  }
 
   return [score, reasons];
 }
@@ -204,6 +334,26 @@ export function detectDisguisedExecutable(data: Buffer): string | null {
   return null;
 }
 
+// Magic-byte checks only look at the first few bytes, so read just the start of the
+// body and cancel the rest of the download — a 20 MB screenshot costs one chunk.
+export async function readHeader(res: Response, maxBytes = 4096): Promise<Buffer> {
+  if (!res.body) return Buffer.alloc(0);
+  const reader = res.body.getReader();
+  const chunks: Buffer[] = [];
+  let total = 0;
+  try {
+    while (total < maxBytes) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      chunks.push(Buffer.from(value));
+      total += value.byteLength;
+    }
+  } finally {
+    reader.cancel().catch(() => null);
+  }
+  return Buffer.concat(chunks).subarray(0, maxBytes);
+}
+
 // ── Admin alert ───────────────────────────────────────────────────────────────
 
 const ACTION_COLORS: Record<string, number> = {
@@ -235,10 +385,15 @@ export async function alertAdmins(
   const avatar = typeof member.avatarURL === 'function' ? member.avatarURL() : null;
   if (avatar) embed.setThumbnail(avatar);
 
-  for (const channelId of cfg.alertChannelIds) {
+  // Channels are independent routes, so send to all of them at once; a failure in one
+  // (missing permission, deleted channel) is swallowed per channel as before. The embed
+  // is serialized once and the same payload shared, rather than each send re-running
+  // toJSON on the builder.
+  const payload = { embeds: [embed.toJSON()] };
+  await Promise.all([...cfg.alertChannelIds].map(channelId => {
     const channel = guild.channels.cache.get(channelId) as TextChannel | undefined;
-    if (channel) await channel.send({ embeds: [embed] }).catch(() => null);
-  }
+    return channel?.send(payload).catch(() => null);
+  }));
 }
 
 // ── Instant ban ───────────────────────────────────────────────────────────────
@@ -366,7 +521,7 @@ export async function checkEmbedImages(message: Message): Promise<string | null>
 
     try {
       const res = await fetch(url, { signal: AbortSignal.timeout(5000) });
-      const buf = Buffer.from(await res.arrayBuffer());
+      const buf = await readHeader(res);
       // Only ban on a genuinely malicious payload (an executable disguised as an
       // image). Embed image URLs routinely resolve to non-image content — expired
       // Discord CDN links return JSON, link previews can return SVG/HTML — and that
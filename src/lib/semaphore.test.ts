@@ -0,0 +1,36 @@
+import { describe, it, expect } from 'vitest';
+import { Semaphore } from './semaphore';
+
+describe('Semaphore', () => {
+  it('grants up to max slots immediately, then queues', async () => {
+    const sem = new Semaphore(2);
+    expect(await sem.acquire()).toBe(true);
+    expect(await sem.acquire()).toBe(true);
+
+    let third = false;
+    const p = sem.acquire().then(ok => { third = ok; });
+    await Promise.resolve();
+    expect(third).toBe(false);
+    expect(sem.pending).toBe(1);
+
+    sem.release();
+    await p;
+    expect(third).toBe(true);
+    expect(sem.pending).toBe(0);
+  });
+
+  it('refuses new waiters once the queue is full', async () => {
+    const sem = new Semaphore(1, 1);
+    expect(await sem.acquire()).toBe(true);
+    void sem.acquire(); // queued
+    expect(await sem.acquire()).toBe(false); // queue full
+    expect(sem.pending).toBe(1);
+  });
+
+  it('throws when released more often than acquired', async () => {
+    const sem = new Semaphore(1);
+    await sem.acquire();
+    sem.release();
+    expect(() => sem.release()).toThrow();
+  });
+});
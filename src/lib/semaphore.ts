@@ -0,0 +1,40 @@
+// Counting semaphore with a bounded wait queue. Caps how many tasks run at once and,
+// unlike an unbounded queue, refuses new waiters once `maxPending` are already queued —
+// so an upload burst degrades to "skipped" instead of piling up buffered images in memory.
+export class Semaphore {
+  private active = 0;
+  private waiters: Array<() => void> = [];
+
+  constructor(
+    private readonly max: number,
+    private readonly maxPending: number = Infinity,
+  ) {}
+
+  // Tasks waiting for a slot (queue depth).
+  get pending(): number {
+    return this.waiters.length;
+  }
+
+  // Resolves true once a slot is held, or false immediately if the queue is full.
+  async acquire(): Promise<boolean> {
+    if (this.active < this.max) {
+      this.active++;
+      return true;
+    }
+    if (this.waiters.length >= this.maxPending) return false;
+    await new Promise<void>(resolve => this.waiters.push(resolve));
+    return true;
+  }
+
+  // Hands the slot straight to the next waiter, if any. Releasing a slot that was never
+  // acquired is a bug (it would silently raise the cap), so it throws.
+  release(): void {
+    const next = this.waiters.shift();
+    if (next) {
+      next();
+      return;
+    }
+    if (this.active === 0) throw new Error('Semaphore released more times than acquired');
+    this.active--;
+  }
+}